@@ -0,0 +1,74 @@
+"""
+month availability of a room, from RoomNight (room, night) index.
+
+    booked: one char per day of the month, "1" = that night is booked
+    ranges: [first booked night, check out day] pairs, like check_in / check_out
+
+cached per (room, month). booking 이 바뀌면 room 의 version 을 올려서
+그 room 의 모든 달 캐시를 한번에 무효화함 (달마다 key 를 지울 필요 없음).
+locmem cache 는 worker 마다 따로라서 CALENDAR_CACHE_TIMEOUT 만큼은 늦을 수 있음,
+여러 worker 면 CACHES 에 공용 cache (redis, memcached) 를 설정할 것
+"""
+import calendar
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from .models import RoomNight
+
+
+def version_key(room_pk):
+    return f"room-calendar-version:{room_pk}"
+
+
+def invalidate(*room_pks):
+    for room_pk in room_pks:
+        if not room_pk:
+            continue
+        try:
+            cache.incr(version_key(room_pk))
+        except ValueError:
+            cache.set(version_key(room_pk), 1, None)
+
+
+def build(room_pk, year, month):
+    days = calendar.monthrange(year, month)[1]
+    first = date(year, month, 1)
+    booked = set(
+        RoomNight.objects.filter(
+            room_id=room_pk,
+            night__gte=first,
+            night__lte=first + timedelta(days=days - 1),
+        ).values_list("night", flat=True)
+    )
+    bitmap = "".join(
+        "1" if first + timedelta(days=day) in booked else "0" for day in range(days)
+    )
+    ranges = []
+    start = None
+    for day, flag in enumerate(bitmap + "0"):
+        if flag == "1" and start is None:
+            start = day
+        elif flag == "0" and start is not None:
+            ranges.append(
+                [
+                    (first + timedelta(days=start)).isoformat(),
+                    (first + timedelta(days=day)).isoformat(),
+                ]
+            )
+            start = None
+    return {
+        "month": f"{year:04d}-{month:02d}",
+        "days": days,
+        "booked": bitmap,
+        "ranges": ranges,
+    }
+
+
+def month_calendar(room_pk, year, month):
+    version = cache.get(version_key(room_pk), 0)
+    key = f"room-calendar:{room_pk}:{version}:{year:04d}-{month:02d}"
+    data = cache.get(key)
+    if data is None:
+        data = build(room_pk, year, month)
+        cache.set(key, data, getattr(settings, "CALENDAR_CACHE_TIMEOUT", 300))
+    return data
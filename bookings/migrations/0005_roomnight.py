@@ -0,0 +1,52 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:13
+
+from datetime import timedelta
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_nights(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    RoomNight = apps.get_model("bookings", "RoomNight")
+    bookings = Booking.objects.filter(
+        kind="room",
+        room__isnull=False,
+        check_in__isnull=False,
+        check_out__isnull=False,
+    )
+    nights = []
+    for booking in bookings.iterator():
+        for day in range((booking.check_out - booking.check_in).days):
+            nights.append(
+                RoomNight(
+                    booking_id=booking.pk,
+                    room_id=booking.room_id,
+                    night=booking.check_in + timedelta(days=day),
+                )
+            )
+    RoomNight.objects.bulk_create(nights, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0010_room_latitude_longitude_geohash'),
+        ('bookings', '0004_remove_booking_experience_max_team'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField()),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booked_nights', to='bookings.booking')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booked_nights', to='rooms.room')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='roomnight',
+            index=models.Index(fields=['room', 'night'], name='roomnight_room_night_idx'),
+        ),
+        migrations.RunPython(backfill_nights, migrations.RunPython.noop),
+    ]
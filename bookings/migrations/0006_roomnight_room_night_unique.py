@@ -0,0 +1,34 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:14
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def drop_duplicate_nights(apps, schema_editor):
+    # 예전 검사로 이미 겹쳐 들어간 예약이 있으면 먼저 들어온 예약의 밤만 남김
+    RoomNight = apps.get_model("bookings", "RoomNight")
+    keep = (
+        RoomNight.objects.values("room", "night")
+        .annotate(first=Min("pk"))
+        .values_list("first", flat=True)
+    )
+    RoomNight.objects.exclude(pk__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_roomnight'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_nights, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='roomnight',
+            name='roomnight_room_night_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='roomnight',
+            constraint=models.UniqueConstraint(fields=('room', 'night'), name='roomnight_room_night_unique'),
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from datetime import timedelta
+from django.db import models, transaction
 from common.models import CommonModel
 
 
@@ -49,3 +50,71 @@ class Booking(CommonModel):
 
     def __str__(self):
         return f"{self.kind.title()} booking for: {self.user}"
+
+    def nights(self):
+        """dates this booking occupies the room (check_out day is free)"""
+        if not (self.check_in and self.check_out):
+            return []
+        return [
+            self.check_in + timedelta(days=day)
+            for day in range((self.check_out - self.check_in).days)
+        ]
+
+    def save(self, *args, **kwargs):
+        # post_save 의 sync_nights() 까지 한 transaction, 밤이 겹치면 booking 도 같이 rollback
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def sync_nights(self):
+        """
+        RoomNight rows match check_in / check_out, raises IntegrityError if a night
+        is taken. runs from post_save inside the atomic block of save()
+        """
+        from . import calendar
+
+        old_nights = RoomNight.objects.filter(booking=self)
+        room_pks = set(old_nights.values_list("room", flat=True))
+        old_nights.delete()
+        if self.kind == Booking.BookingKindChoices.ROOM and self.room_id:
+            RoomNight.objects.bulk_create(
+                [
+                    RoomNight(booking=self, room_id=self.room_id, night=night)
+                    for night in self.nights()
+                ]
+            )
+            room_pks.add(self.room_id)
+        # commit 전에 version 을 올리면 다른 request 가 commit 전 data 로 다시 만들어
+        # 새 version 에 cache 해버림, rollback 되면 올릴 필요도 없음
+        transaction.on_commit(lambda: calendar.invalidate(*room_pks))
+
+
+class RoomNight(models.Model):
+
+    """
+    One booked night of a room, kept in sync with Booking (bookings/signals.py).
+    "이 날짜에 비어있나" 를 (room, night) index 한 번으로 확인하려고 만든 테이블.
+    (room, night) 가 unique 라서 같은 밤을 두 번 예약하면 IntegrityError 가 남
+    """
+
+    booking = models.ForeignKey(
+        "bookings.Booking",
+        on_delete=models.CASCADE,
+        related_name="booked_nights",
+    )
+    room = models.ForeignKey(
+        "rooms.Room",
+        on_delete=models.CASCADE,
+        related_name="booked_nights",
+    )
+    night = models.DateField()
+
+    def __str__(self):
+        return f"{self.room_id} / {self.night}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["room", "night"],
+                name="roomnight_room_night_unique",
+            ),
+        ]
@@ -1,6 +1,6 @@
 from django.utils import timezone
 from rest_framework import serializers
-from .models import Booking
+from .models import Booking, RoomNight
 
 
 class CreateRoomBookingSerializer(serializers.ModelSerializer):
@@ -17,26 +17,35 @@ class CreateRoomBookingSerializer(serializers.ModelSerializer):
         )
 
     def validate_check_in(self, value):
-        now = timezone.localtime(timezone.now()).date()
+        now = timezone.now().date()
         if now > value:
             raise serializers.ValidationError("Can't book in the past!")
         return value
 
     def validate_check_out(self, value):
-        now = timezone.localtime(timezone.now()).date()
+        now = timezone.now().date()
         if now > value:
             raise serializers.ValidationError("Can't book in the past!")
         return value
 
     def validate(self, data):
-        if data["check_out"] <= data["check_in"]:
+        check_in = data.get("check_in", getattr(self.instance, "check_in", None))
+        check_out = data.get("check_out", getattr(self.instance, "check_out", None))
+        if not check_in or not check_out:
+            raise serializers.ValidationError("check_in and check_out are required")
+        if check_out <= check_in:
             raise serializers.ValidationError(
                 "Check in Should be smaller than check out"
             )
-        if Booking.objects.filter(
-            check_in__lte=data["check_out"],
-            check_out__gte=data["check_in"],
-        ).exists():
+        # 빠른 실패용 probe, 동시에 들어온 예약은 RoomNight unique constraint 가 막음
+        taken = RoomNight.objects.filter(
+            room=self.context["room"],
+            night__gte=check_in,
+            night__lt=check_out,
+        )
+        if self.instance:
+            taken = taken.exclude(booking=self.instance)
+        if taken.exists():
             raise serializers.ValidationError(
                 "Those(or some) of those dates are already taken."
             )
@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from experiences.models import ExperienceSlot
+from rooms import popularity
+from . import calendar
+from .models import Booking
+
+
+@receiver(post_save, sender=Booking)
+def sync_nights(sender, instance, raw=False, **kwargs):
+    # 삭제는 RoomNight.booking 의 CASCADE 가 처리함
+    if not raw:
+        instance.sync_nights()
+
+
+@receiver(post_save, sender=Booking)
+def count_room_booking(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.room_id:
+        popularity.booked(instance.room_id)
+
+
+@receiver(post_delete, sender=Booking)
+def uncount_room_booking(sender, instance, **kwargs):
+    if instance.room_id:
+        popularity.booked(instance.room_id, -1)
+
+
+@receiver(post_delete, sender=Booking)
+def invalidate_calendar(sender, instance, **kwargs):
+    room_pk = instance.room_id
+    transaction.on_commit(lambda: calendar.invalidate(room_pk))
+
+
+@receiver(post_delete, sender=Booking)
+def release_slot(sender, instance, **kwargs):
+    if instance.experience_id and instance.experience_time:
+        ExperienceSlot.objects.release(instance.experience_id, instance.experience_time)
@@ -1,3 +1,105 @@
-from django.test import TestCase
+from datetime import date
+from django.db import IntegrityError
+from rest_framework.test import APITestCase
+from users.models import User
+from rooms.models import Room
+from .models import Booking, RoomNight
 
-# Create your tests here.
+
+class TestRoomBooking(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="guest")
+        self.room = Room.objects.create(
+            name="room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+        self.other_room = Room.objects.create(
+            name="other",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+        self.client.force_authenticate(self.user)
+
+    def book(self, room, check_in, check_out):
+        return self.client.post(
+            f"/api/v1/rooms/{room.pk}/bookings",
+            {"check_in": check_in, "check_out": check_out, "guests": 1},
+        )
+
+    def test_overlap_is_scoped_to_room(self):
+        self.assertIn("pk", self.book(self.room, "2030-01-10", "2030-01-12").json())
+        self.assertIn(
+            "pk", self.book(self.other_room, "2030-01-10", "2030-01-12").json()
+        )
+        self.assertNotIn("pk", self.book(self.room, "2030-01-11", "2030-01-13").json())
+        # check_out day is free for the next guest
+        self.assertIn("pk", self.book(self.room, "2030-01-12", "2030-01-13").json())
+        self.assertEqual(RoomNight.objects.filter(room=self.room).count(), 3)
+
+    def test_same_night_cannot_be_stored_twice(self):
+        booking = Booking.objects.create(
+            kind=Booking.BookingKindChoices.ROOM,
+            user=self.user,
+            room=self.room,
+            check_in=date(2030, 1, 10),
+            check_out=date(2030, 1, 11),
+            guests=1,
+        )
+        # save() 가 booking 과 nights 를 한 transaction 으로 씀
+        with self.assertRaises(IntegrityError):
+            Booking.objects.create(
+                kind=Booking.BookingKindChoices.ROOM,
+                user=self.user,
+                room=self.room,
+                check_in=date(2030, 1, 10),
+                check_out=date(2030, 1, 11),
+                guests=1,
+            )
+        self.assertEqual(list(Booking.objects.all()), [booking])
+
+        later = Booking.objects.create(
+            kind=Booking.BookingKindChoices.ROOM,
+            user=self.user,
+            room=self.room,
+            check_in=date(2030, 1, 12),
+            check_out=date(2030, 1, 13),
+            guests=1,
+        )
+        later.check_in = date(2030, 1, 10)
+        with self.assertRaises(IntegrityError):
+            later.save()
+        self.assertEqual(
+            list(later.booked_nights.values_list("night", flat=True)),
+            [date(2030, 1, 12)],
+        )
+
+    def test_month_calendar(self):
+        url = f"/api/v1/rooms/{self.room.pk}/calendar"
+        self.book(self.room, "2030-01-30", "2030-02-02")
+        january = self.client.get(url, {"month": "2030-01"}).json()
+        self.assertEqual(january["booked"], "0" * 29 + "11")
+        self.assertEqual(january["ranges"], [["2030-01-30", "2030-02-01"]])
+        february = self.client.get(url, {"month": "2030-02"}).json()
+        self.assertEqual(february["booked"], "1" + "0" * 27)
+
+        # cached calendar is invalidated once the booking change commits
+        with self.captureOnCommitCallbacks() as callbacks:
+            Booking.objects.filter(room=self.room).delete()
+        january = self.client.get(url, {"month": "2030-01"}).json()
+        self.assertEqual(january["booked"], "0" * 29 + "11")
+        for callback in callbacks:
+            callback()
+        january = self.client.get(url, {"month": "2030-01"}).json()
+        self.assertEqual(january["booked"], "0" * 31)
+        self.assertEqual(self.client.get(url, {"month": "2030-13"}).status_code, 400)
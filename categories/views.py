@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.status import HTTP_204_NO_CONTENT
+from common import refdata
 from .serializers import CategorySerializer
 
 
@@ -12,6 +13,10 @@ class CategoryViewSet(ModelViewSet):
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
 
+    def list(self, request, *args, **kwargs):
+        # 목록은 common/refdata.py 의 메모리 캐시 + ETag
+        return refdata.categories.list_response(request, self.get_serializer_class())
+
     
 
 
@@ -0,0 +1,82 @@
+"""
+set based M2M assignment (room amenities, experience perks)
+
+id 마다 get() + add() 를 하면 id 수 x 2 번 query 를 하게 되고, 처음 없는 id 에서 멈춰서
+나머지 틀린 id 는 알려주지 못함. 그래서
+  1. validate(): 모든 id 를 한번에 확인 (common.refdata 메모리, 없는 것만 DB 에 한번), 없는 id 를 전부 알려줌
+  2. assign(): 지금 들어있는 id 를 한번 읽고, 빠진 것만 bulk insert, 없어진 것만 delete
+through table 에 직접 쓰므로 m2m_changed signal 은 보내지 않음.
+"""
+from django.db import transaction
+from rest_framework.exceptions import ParseError
+
+
+def to_pk(value):
+    """int pk or None, "3" is 3 but True / 1.5 / "a" are not ids"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return None
+
+
+def validate(reference, values, field):
+    """set of existing pks, ParseError listing every unknown id"""
+    if values is None:
+        return set()
+    if not isinstance(values, (list, tuple)):
+        raise ParseError({field: ["Should be a list of ids"]})
+    unknown = []
+    candidates = {}
+    for value in values:
+        pk = to_pk(value)
+        if pk is None:
+            unknown.append(value)
+        else:
+            candidates.setdefault(pk, value)
+    found, missing = reference.get_many(candidates)
+    pks = set(found)
+    if missing:
+        # 다른 worker 에서 방금 만들어져서 아직 캐시에 없는 것일 수 있음
+        existing = set(
+            reference.model.objects.filter(pk__in=missing).values_list("pk", flat=True)
+        )
+        pks |= existing
+        unknown += [candidates[pk] for pk in missing if pk not in existing]
+    if unknown:
+        raise ParseError(
+            {field: [f"Not found: {', '.join(str(pk) for pk in unknown)}"]}
+        )
+    return pks
+
+
+def assign(instance, field, pks, replace=True):
+    """
+    make instance.<field> hold pks (replace=False only adds).
+    returns (added pks, removed pks)
+    """
+    relation = getattr(type(instance), field)
+    through = relation.through
+    source = relation.field.m2m_column_name()  # room_id
+    target = relation.field.m2m_reverse_name()  # amenity_id
+    pks = set(pks)
+    with transaction.atomic():
+        rows = through.objects.filter(**{source: instance.pk})
+        current = set(rows.values_list(target, flat=True))
+        added = pks - current
+        removed = current - pks if replace else set()
+        if removed:
+            rows.filter(**{f"{target}__in": removed}).delete()
+        if added:
+            through.objects.bulk_create(
+                [through(**{source: instance.pk, target: pk}) for pk in added],
+                ignore_conflicts=True,
+            )
+    # prefetch 해둔 예전 목록이 응답에 쓰이지 않게
+    getattr(instance, "_prefetched_objects_cache", {}).pop(field, None)
+    return added, removed
@@ -0,0 +1,231 @@
+"""
+in-memory buffered increments for counter columns (write-behind)
+
+event 마다 UPDATE 를 하면 SQLite 의 writer lock 에 줄을 서게 돼서,
+worker 메모리에 pk 별로 모아뒀다가 flush 때 같은 증가량끼리 묶어서
+UPDATE ... WHERE pk IN (...) 한번으로 씀.
+
+flush 는
+  - config/wsgi.py, asgi.py 가 start() 한 worker: background thread 가
+    COUNTER_FLUSH_POLL_SECONDS 마다 flush 할 때가 된 counter (flush_seconds 가 지났거나
+    flush_threshold 를 넘은) 를 씀, threshold 를 넘으면 바로 깨움, 종료할 때 마지막으로 한번 (atexit)
+  - thread 가 없는 곳 (runserver 외 manage.py, tests): event 를 만든 request 가 끝날 때
+SIGKILL 처럼 atexit 이 안 도는 종료라면 그만큼은 잃음.
+pending backlog 는 GET api/v1/metrics 의 sources.counters 에서 볼 수 있음.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class BufferedCounter:
+    def __init__(self, name, model, fields, flush_threshold=100, flush_seconds=10):
+        if name in _registry:
+            raise ValueError(f"Counter {name} is already registered")
+        self.name = name
+        self.model = model
+        self.fields = tuple(fields)
+        self.flush_threshold = flush_threshold
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._pending = defaultdict(Counter)
+        self._events = 0
+        self._oldest = None
+        self._local = threading.local()
+        _registry[name] = self
+
+    def add(self, pk, **deltas):
+        unknown = set(deltas) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Unknown counter fields: {', '.join(sorted(unknown))}")
+        with self._lock:
+            self._pending[pk].update(deltas)
+            self._events += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = self._events >= self.flush_threshold
+        self._local.dirty = True
+        if full and running():
+            _flusher.wake.set()
+
+    def pending(self):
+        with self._lock:
+            return self._events
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": self._events,
+                "rows": len(self._pending),
+                "age_seconds": round(time.monotonic() - self._oldest, 3)
+                if self._oldest
+                else 0,
+            }
+
+    def should_flush(self):
+        with self._lock:
+            if not self._events:
+                return False
+            return (
+                self._events >= self.flush_threshold
+                or time.monotonic() - self._oldest >= self.flush_seconds
+            )
+
+    def start_request(self):
+        self._local.dirty = False
+
+    def maybe_flush(self):
+        # event 를 만든 request 만 flush 함, 상관없는 request 는 기다리지 않게
+        if not getattr(self._local, "dirty", False):
+            return 0
+        self._local.dirty = False
+        if self.should_flush():
+            return self.flush()
+        return 0
+
+    def take(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = defaultdict(Counter)
+            self._events = 0
+            self._oldest = None
+        return pending
+
+    def restore(self, pending):
+        with self._lock:
+            for pk, deltas in pending.items():
+                self._pending[pk].update(deltas)
+                self._events += 1
+            if self._oldest is None and self._events:
+                self._oldest = time.monotonic()
+
+    def clear(self):
+        self.take()
+
+    def get_updates(self, deltas):
+        """{field: expression} for one group of rows, override to update more columns"""
+        # 취소가 먼저 flush 돼도 0 아래로는 안 내려가게 (PositiveIntegerField)
+        return {
+            field: F(field) + delta
+            if delta > 0
+            else Greatest(F(field) + delta, Value(0))
+            for field, delta in deltas
+        }
+
+    def flush(self):
+        """writes every pending increment, returns how many rows were updated"""
+        pending = self.take()
+        if not pending:
+            return 0
+        groups = defaultdict(list)
+        for pk, deltas in pending.items():
+            deltas = tuple(sorted((f, d) for f, d in deltas.items() if d))
+            if deltas:
+                groups[deltas].append(pk)
+        updated = 0
+        try:
+            with metrics.timer(f"counters.{self.name}.flush"):
+                with transaction.atomic():
+                    for deltas, pks in groups.items():
+                        updated += self.model.objects.filter(pk__in=pks).update(
+                            **self.get_updates(deltas)
+                        )
+        except Exception:
+            # 다음 flush 때 다시 시도
+            self.restore(pending)
+            metrics.incr(f"counters.{self.name}.errors")
+            raise
+        metrics.incr(f"counters.{self.name}.rows", updated)
+        return updated
+
+
+def flush_all(due_only=False):
+    for counter in list(_registry.values()):
+        if due_only and not counter.should_flush():
+            continue
+        try:
+            counter.flush()
+        except Exception:
+            logger.exception("Flushing counter %s failed", counter.name)
+
+
+class Flusher(threading.Thread):
+    def __init__(self, interval):
+        super().__init__(name="counter-flusher", daemon=True)
+        self.interval = interval
+        self.wake = threading.Event()
+        self.stopping = False
+
+    def run(self):
+        while not self.stopping:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            flush_all(due_only=not self.stopping)
+            connections.close_all()
+
+
+_flusher = None
+
+
+def running():
+    # fork 된 자식 (gunicorn --preload) 에는 thread 가 따라오지 않음
+    return _flusher is not None and _flusher.is_alive()
+
+
+def start():
+    """background flush for a serving process, called by config/wsgi.py and asgi.py"""
+    global _flusher
+    if running():
+        return
+    _flusher = Flusher(getattr(settings, "COUNTER_FLUSH_POLL_SECONDS", 1))
+    _flusher.start()
+    atexit.register(stop)
+
+
+def stop():
+    """stops the thread and writes whatever is left"""
+    global _flusher
+    flusher, _flusher = _flusher, None
+    if flusher:
+        flusher.stopping = True
+        flusher.wake.set()
+        flusher.join(timeout=10)
+    flush_all()
+
+
+def stats():
+    return {name: counter.stats() for name, counter in _registry.items()}
+
+
+metrics.register("counters", stats)
+
+
+def start_requests(sender, **kwargs):
+    for counter in _registry.values():
+        counter.start_request()
+
+
+def flush_requests(sender, **kwargs):
+    if running():
+        return
+    for counter in _registry.values():
+        try:
+            counter.maybe_flush()
+        except Exception:
+            logger.exception("Flushing counter %s failed", counter.name)
+
+
+request_started.connect(start_requests, dispatch_uid="common.counters.start")
+request_finished.connect(flush_requests, dispatch_uid="common.counters.flush")
@@ -0,0 +1,133 @@
+"""
+filtered list + facet counts, shared by GET api/v1/rooms/search and api/v1/experiences/
+
+filter 는 dimension 별 Q 로 나눠두고 ({"price": Q(...), "city": Q(...)}),
+facet 은 자기 dimension 만 빼고 나머지 조건으로 셈 (가격을 골라도 다른 가격대 수가 보이게).
+facet 하나당 GROUP BY 쿼리 하나, 값 개수와 상관없이 쿼리 수는 고정.
+"""
+from django.db.models import Count, F, IntegerField, Q
+from django.db.models.functions import Cast
+from .pagination import KeysetPagination
+
+
+class FacetedSearchMixin:
+
+    model = None
+
+    # Q(field=value) 로 거르고 그대로 GROUP BY 로 세는 필드
+    filter_fields = ()
+
+    price_bucket_size = 10000
+
+    def get_filters(self, params):
+        filters = {}
+        self.add_range(
+            filters, "price", params.get("min_price"), params.get("max_price")
+        )
+        for field in self.filter_fields:
+            if field in params:
+                filters[field] = Q(**{field: params[field]})
+        return filters
+
+    def add_range(self, filters, field, low=None, high=None):
+        """field__gte / field__lte under the field's own dimension"""
+        for lookup, value in (("gte", low), ("lte", high)):
+            if value is not None:
+                filters[field] = filters.get(field, Q()) & Q(
+                    **{f"{field}__{lookup}": value}
+                )
+
+    def has_all(self, relation, pks):
+        """Q for rows related to every one of pks (M2M relation name)"""
+        field = self.model._meta.get_field(relation)
+        source = field.m2m_column_name()  # room_id
+        target = field.m2m_reverse_name()  # amenity_id
+        rows = (
+            field.remote_field.through.objects.filter(**{f"{target}__in": pks})
+            .values(source)
+            .annotate(total=Count(target))
+            .filter(total=len(pks))
+            .values(source)
+        )
+        return Q(pk__in=rows)
+
+    def get_queryset(self, filters, exclude=None):
+        query = Q()
+        for dimension, condition in filters.items():
+            if dimension != exclude:
+                query &= condition
+        return self.model.objects.filter(query)
+
+    def count_by(self, filters, field):
+        return list(
+            self.get_queryset(filters, exclude=field)
+            .order_by()
+            .values(field)
+            .annotate(count=Count("pk"))
+            .order_by("-count", field)
+        )
+
+    def count_named(self, filters, field):
+        """FK facet with the related name, [{pk, name, count}]"""
+        rows = (
+            self.get_queryset(filters, exclude=field)
+            .order_by()
+            .values(field, f"{field}__name")
+            .annotate(count=Count("pk"))
+            .order_by("-count", field)
+        )
+        return [
+            {"pk": row[field], "name": row[f"{field}__name"], "count": row["count"]}
+            for row in rows
+        ]
+
+    def count_related(self, filters, relation):
+        """M2M facet over the fully filtered rows, [{pk, name, count}]"""
+        field = self.model._meta.get_field(relation)
+        source = field.m2m_field_name()  # room
+        target = field.m2m_reverse_field_name()  # amenity
+        rows = (
+            field.remote_field.through.objects.filter(
+                **{f"{source}__in": self.get_queryset(filters).values("pk")}
+            )
+            .values(target, f"{target}__name")
+            .annotate(count=Count(source))
+            .order_by("-count", target)
+        )
+        return [
+            {"pk": row[target], "name": row[f"{target}__name"], "count": row["count"]}
+            for row in rows
+        ]
+
+    def count_prices(self, filters):
+        size = self.price_bucket_size
+        prices = (
+            self.get_queryset(filters, exclude="price")
+            .order_by()
+            .annotate(bucket=Cast(F("price") / size, IntegerField()))
+            .values("bucket")
+            .annotate(count=Count("pk"))
+            .order_by("bucket")
+        )
+        return [
+            {
+                "min_price": price["bucket"] * size,
+                "max_price": (price["bucket"] + 1) * size - 1,
+                "count": price["count"],
+            }
+            for price in prices
+        ]
+
+    def get_facets(self, filters):
+        facets = {field: self.count_by(filters, field) for field in self.filter_fields}
+        facets["price"] = self.count_prices(filters)
+        return facets
+
+    def paginate_with_facets(self, request, filters, queryset, serialize):
+        """one page of queryset, serialize(page) > data, + facets on the first page"""
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        data = paginator.get_paginated_data(serialize(page))
+        if not paginator.previous_cursor:
+            data["facets"] = self.get_facets(filters)
+        return data
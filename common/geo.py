@@ -0,0 +1,145 @@
+"""
+geohash grid index for models with latitude / longitude (common.models.GeoModel)
+
+SQLite 에는 공간 index 가 없어서 좌표를 geohash 문자열로 바꿔 일반 index 에 넣음.
+같은 prefix = 같은 격자 칸이라, 범위 검색은 "bbox 를 덮는 칸들의 prefix range" 로 바뀜.
+"""
+import math
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+PRECISION = 9  # ~5m
+
+EARTH_RADIUS_KM = 6371.0088
+
+KM_PER_LAT_DEGREE = 111.32
+
+MAX_COVER_CELLS = 32
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = bits * 2 + 1
+                lng_range[0] = mid
+            else:
+                bits = bits * 2
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = bits * 2 + 1
+                lat_range[0] = mid
+            else:
+                bits = bits * 2
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(geohash)
+
+
+def cell_size(precision):
+    """(lat degrees, lng degrees) of one cell"""
+    bits = precision * 5
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def cover(min_lat, min_lng, max_lat, max_lng, max_cells=MAX_COVER_CELLS):
+    """geohash prefixes of the cells that overlap the bbox, as fine as max_cells allows"""
+    for precision in range(PRECISION, 0, -1):
+        lat_step, lng_step = cell_size(precision)
+        rows = math.floor(max_lat / lat_step) - math.floor(min_lat / lat_step) + 1
+        cols = math.floor(max_lng / lng_step) - math.floor(min_lng / lng_step) + 1
+        if rows * cols <= max_cells:
+            break
+    cells = set()
+    for row in range(rows):
+        latitude = min(min_lat + row * lat_step, max_lat)
+        for col in range(cols):
+            longitude = min(min_lng + col * lng_step, max_lng)
+            cells.add(encode(latitude, longitude, precision))
+    return sorted(cells)
+
+
+def cover_q(cells):
+    # startswith 는 SQLite 에서 LIKE 라 index 를 못 탐 > prefix 를 range 로 바꿈 ("{" > "z")
+    query = Q()
+    for cell in cells:
+        query |= Q(geohash__gte=cell, geohash__lt=cell + "{")
+    return query
+
+
+def bbox_around(latitude, longitude, radius_km):
+    lat_delta = radius_km / KM_PER_LAT_DEGREE
+    lng_delta = radius_km / (
+        KM_PER_LAT_DEGREE * max(math.cos(math.radians(latitude)), 0.01)
+    )
+    return (
+        max(latitude - lat_delta, -90.0),
+        max(longitude - lng_delta, -180.0),
+        min(latitude + lat_delta, 90.0),
+        min(longitude + lng_delta, 180.0),
+    )
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    """haversine"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def within_bbox(queryset, min_lat, min_lng, max_lat, max_lng):
+    return queryset.filter(
+        cover_q(cover(min_lat, min_lng, max_lat, max_lng)),
+        latitude__range=(min_lat, max_lat),
+        longitude__range=(min_lng, max_lng),
+    )
+
+
+def nearest(queryset, latitude, longitude, bbox, radius_km=None, limit=None):
+    """
+    objects in bbox (and radius) sorted by distance, each with .distance (km).
+    SQL 에서 평면 근사 거리 (위도 도 단위의 제곱) 로 정렬 / 거리 제한 / LIMIT 까지 하고,
+    가져온 limit 개만 haversine 으로 다시 재서 정확한 거리로 자름
+    """
+    # 경도 1도는 cos(위도) 만큼 짧음, 작은 범위라 중심 위도 하나로 충분
+    scale = max(math.cos(math.radians(latitude)), 0.01)
+    lat_delta = F("latitude") - Value(latitude)
+    lng_delta = (F("longitude") - Value(longitude)) * Value(scale)
+    rows = within_bbox(queryset, *bbox).annotate(
+        distance_sq=ExpressionWrapper(
+            lat_delta * lat_delta + lng_delta * lng_delta,
+            output_field=FloatField(),
+        )
+    )
+    if radius_km is not None:
+        # 근사와 haversine 의 차이만큼 여유를 두고, 정확한 거리는 아래에서 자름
+        reach = radius_km / KM_PER_LAT_DEGREE * 1.01
+        rows = rows.filter(distance_sq__lte=reach * reach)
+    rows = rows.order_by("distance_sq", "pk")
+    if limit:
+        rows = rows[:limit]
+    found = []
+    for obj in rows:
+        obj.distance = distance_km(latitude, longitude, obj.latitude, obj.longitude)
+        if radius_km is None or obj.distance <= radius_km:
+            found.append(obj)
+    found.sort(key=lambda obj: obj.distance)
+    return found
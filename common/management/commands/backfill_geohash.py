@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from experiences.models import Experience
+from rooms.models import Room
+
+
+class Command(BaseCommand):
+
+    help = "Fill the geohash grid cell of rooms / experiences from latitude, longitude"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        for model in (Room, Experience):
+            changed = []
+            total = 0
+            rows = model.objects.only("pk", "latitude", "longitude", "geohash")
+            for obj in rows.iterator(chunk_size=batch_size):
+                old_geohash = obj.geohash
+                obj.update_geohash()
+                if obj.geohash != old_geohash:
+                    changed.append(obj)
+                if len(changed) >= batch_size:
+                    total += model.objects.bulk_update(changed, ["geohash"])
+                    changed = []
+            if changed:
+                total += model.objects.bulk_update(changed, ["geohash"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model._meta.verbose_name_plural}: {total} updated"
+                )
+            )
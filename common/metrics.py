@@ -0,0 +1,73 @@
+"""
+process-local counters / gauges / timers, read by GET api/v1/metrics (staff only).
+worker 마다 따로 모임
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_gauges = {}
+_timers = {}
+_sources = {}
+
+
+def incr(name, value=1):
+    with _lock:
+        _counters[name] += value
+
+
+def gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name, milliseconds):
+    with _lock:
+        timer = _timers.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        timer["count"] += 1
+        timer["total_ms"] += milliseconds
+        timer["max_ms"] = max(timer["max_ms"], milliseconds)
+
+
+@contextmanager
+def timer(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, (time.perf_counter() - start) * 1000)
+
+
+def register(name, source):
+    """source() -> dict, called on every snapshot (cache stats etc.)"""
+    _sources[name] = source
+
+
+def snapshot():
+    with _lock:
+        timers = {
+            name: dict(
+                timer,
+                avg_ms=round(timer["total_ms"] / timer["count"], 3),
+                total_ms=round(timer["total_ms"], 3),
+                max_ms=round(timer["max_ms"], 3),
+            )
+            for name, timer in _timers.items()
+        }
+        data = {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "timers": timers,
+        }
+    data["sources"] = {name: source() for name, source in _sources.items()}
+    return data
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _timers.clear()
@@ -1,4 +1,10 @@
+from collections import Counter
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from . import geo
+
+STARS = range(1, 6)
 
 
 class CommonModel(models.Model):
@@ -10,3 +16,126 @@ class CommonModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class GeoModel(models.Model):
+
+    """Latitude / Longitude + geohash grid cell (see common/geo.py)"""
+
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+    )
+    geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        default="",
+        editable=False,
+        db_index=True,
+    )
+
+    def update_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            self.geohash = ""
+        else:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.update_geohash()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and (
+            {"latitude", "longitude"} & set(update_fields)
+        ):
+            kwargs["update_fields"] = set(update_fields) | {"geohash"}
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
+class RatingQuerySet(models.QuerySet):
+
+    """
+    keeps RatingModel columns current, review_field = FK of reviews.Review
+    to this model ("room", "experience")
+    """
+
+    review_field = None
+
+    def add_ratings(self, ratings, sign=1):
+        """add (sign=-1 remove) reviews with these ratings in one UPDATE"""
+        # F() 로 DB 안에서 더하고 빼서 동시에 들어온 리뷰끼리 값을 덮어쓰지 않게 함
+        ratings = list(ratings)
+        updates = {
+            "rating_sum": F("rating_sum") + sign * sum(ratings),
+            "rating_count": F("rating_count") + sign * len(ratings),
+        }
+        for star, count in Counter(r for r in ratings if r in STARS).items():
+            updates[f"rating_{star}"] = F(f"rating_{star}") + sign * count
+        return self.update(**updates)
+
+    def rebuild_ratings(self):
+        from reviews.models import Review
+
+        reviews = (
+            Review.objects.filter(**{self.review_field: OuterRef("pk")})
+            .order_by()
+            .values(self.review_field)
+        )
+
+        def total(reviews, aggregate):
+            return Coalesce(
+                Subquery(reviews.annotate(total=aggregate).values("total")),
+                Value(0),
+            )
+
+        updates = {
+            "rating_sum": total(reviews, Sum("rating")),
+            "rating_count": total(reviews, Count("pk")),
+        }
+        for star in STARS:
+            updates[f"rating_{star}"] = total(reviews.filter(rating=star), Count("pk"))
+        return self.update(**updates)
+
+
+class RatingModel(models.Model):
+
+    """
+    rating_sum, rating_count and the star histogram (rating_1 ~ rating_5) are kept
+    current by reviews/signals.py (and ReviewQuerySet for bulk paths),
+    so rating() / rating_summary() never touch reviews.
+    if they drift, run `python manage.py rebuild_room_ratings` (rebuild_experience_ratings)
+    """
+
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+
+    def rating(self):
+        if self.rating_count == 0:
+            return 0
+        return round(self.rating_sum / self.rating_count, 2)
+
+    def rating_summary(self):
+        return {
+            "rating": self.rating(),
+            "count": self.rating_count,
+            "histogram": {star: getattr(self, f"rating_{star}") for star in STARS},
+        }
+
+    class Meta:
+        abstract = True
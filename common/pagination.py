@@ -0,0 +1,100 @@
+import base64
+import json
+from datetime import datetime
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(BasePagination):
+
+    """
+    cursor pagination ordered by (created_at, pk), newest first (see ordering_field).
+    OFFSET 는 앞 페이지를 전부 건너뛰어야 해서 깊은 페이지일수록 느림,
+    cursor 는 마지막으로 본 (created_at, pk) 다음부터 index 로 바로 찾음.
+    """
+
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+
+    # (ordering_field, pk) 로 정렬, descending = False 면 오래된 것 (작은 값) 부터
+    ordering_field = "created_at"
+    descending = True
+
+    def get_page_size(self, request):
+        page_size = getattr(settings, "PAGE_SIZE", 10)
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            pass
+        return max(1, min(page_size, getattr(settings, "MAX_PAGE_SIZE", 50)))
+
+    def encode_cursor(self, obj, direction):
+        payload = json.dumps(
+            {
+                "c": getattr(obj, self.ordering_field).isoformat(),
+                "p": obj.pk,
+                "d": direction,
+            },
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return (
+                datetime.fromisoformat(payload["c"]),
+                int(payload["p"]),
+                payload["d"] == "prev",
+            )
+        except (ValueError, TypeError, KeyError):
+            raise ParseError("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        backwards = bool(cursor and cursor[2])
+        field = self.ordering_field
+        if self.descending != backwards:
+            queryset = queryset.order_by(f"-{field}", "-pk")
+            lookup = "lt"
+        else:
+            queryset = queryset.order_by(field, "pk")
+            lookup = "gt"
+        if cursor:
+            value, pk, _ = cursor
+            queryset = queryset.filter(
+                Q(**{f"{field}__{lookup}": value})
+                | Q(**{field: value, f"pk__{lookup}": pk})
+            )
+        page = list(queryset[: page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+        if backwards:
+            page.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+        self.next_cursor = None
+        self.previous_cursor = None
+        if page and has_next:
+            self.next_cursor = self.encode_cursor(page[-1], "next")
+        if page and has_previous:
+            self.previous_cursor = self.encode_cursor(page[0], "prev")
+        return page
+
+    def get_paginated_data(self, data):
+        return {
+            "next": self.next_cursor,
+            "previous": self.previous_cursor,
+            "results": data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
@@ -0,0 +1,128 @@
+"""
+in-process cache of small reference tables (amenities, perks, categories)
+
+거의 안 바뀌는 작은 table 이라 worker 마다 통째로 메모리에 들고 있고,
+저장/삭제가 commit 되면 공용 cache (django.core.cache) 의 version 을 올림.
+다른 worker 는 다음에 읽을 때 version 이 다르면 DB 에서 한번 다시 읽음 (lazy reload).
+locmem cache 는 worker 마다 따로라서 여러 worker 면 CACHES 에 공용 cache 를 설정할 것
+(bookings/calendar.py 와 같음).
+"""
+import threading
+import time
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework.response import Response
+from rest_framework.status import HTTP_304_NOT_MODIFIED
+from . import metrics
+
+
+class ReferenceCache:
+    def __init__(self, name, model):
+        self.name = name
+        self.model_label = model
+        self.version_key = f"refdata-version:{name}"
+        self._lock = threading.Lock()
+        self._version = None
+        self._rows = []
+        self._by_pk = {}
+        self.hits = 0
+        self.reloads = 0
+        post_save.connect(self.on_change, sender=model, weak=False)
+        post_delete.connect(self.on_change, sender=model, weak=False)
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def version(self):
+        # 처음이거나 cache 에서 밀려났으면 시각으로 새로 시작 (예전 version 과 겹치지 않게)
+        return cache.get_or_set(self.version_key, int(time.time() * 1000), None)
+
+    def invalidate(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, int(time.time() * 1000), None)
+
+    def on_change(self, sender, raw=False, **kwargs):
+        if not raw:
+            # commit 전에 올리면 다른 worker 가 예전 row 를 새 version 으로 들고 있게 됨
+            transaction.on_commit(self.invalidate)
+
+    def load(self):
+        """current (version, rows, rows by pk), reloads from DB if the version moved"""
+        version = self.version()
+        with self._lock:
+            if version == self._version:
+                self.hits += 1
+                return version, self._rows, self._by_pk
+        rows = list(self.model.objects.order_by("pk"))
+        with self._lock:
+            self._version = version
+            self._rows = rows
+            self._by_pk = {row.pk: row for row in rows}
+            self.reloads += 1
+            return version, self._rows, self._by_pk
+
+    def all(self):
+        return self.load()[1]
+
+    def get(self, pk):
+        """cached instance or None, shared between requests so don't modify it"""
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return None
+        return self.load()[2].get(pk)
+
+    def get_many(self, pks):
+        """({pk: instance}, [missing pk])"""
+        by_pk = self.load()[2]
+        found = {}
+        missing = []
+        for pk in pks:
+            try:
+                found[int(pk)] = by_pk[int(pk)]
+            except (KeyError, TypeError, ValueError):
+                missing.append(pk)
+        return found, missing
+
+    def list_response(self, request, serializer_class):
+        """serialized rows with an ETag, 304 if the client already has this version"""
+        version, rows, _ = self.load()
+        etag = f'"{self.name}-{version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status=HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        serializer = serializer_class(rows, many=True, context={"request": request})
+        return Response(serializer.data, headers={"ETag": etag})
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.reloads
+            return {
+                "version": self._version,
+                "size": len(self._rows),
+                "hits": self.hits,
+                "reloads": self.reloads,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._rows = []
+            self._by_pk = {}
+            self.hits = 0
+            self.reloads = 0
+
+
+amenities = ReferenceCache("amenities", "rooms.Amenity")
+perks = ReferenceCache("perks", "experiences.Perk")
+categories = ReferenceCache("categories", "categories.Category")
+
+metrics.register(
+    "refdata",
+    lambda: {ref.name: ref.stats() for ref in (amenities, perks, categories)},
+)
@@ -0,0 +1,64 @@
+from rest_framework import serializers
+from . import geo
+
+
+class NearbySerializer(serializers.Serializer):
+
+    """
+    query params of the nearby (map) endpoints, either
+    lat & lng (& radius km) or min_lat & min_lng & max_lat & max_lng
+    """
+
+    MAX_RADIUS_KM = 100
+
+    # 거리순 LIMIT 은 SQL 에서 하지만 bbox 안의 row 는 다 훑으므로 나라 전체 같은 큰 bbox 는 거절
+    MAX_BBOX_DEGREES = 2
+
+    lat = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    lng = serializers.FloatField(required=False, min_value=-180, max_value=180)
+    radius = serializers.FloatField(
+        required=False,
+        min_value=0,
+        max_value=MAX_RADIUS_KM,
+        default=5,
+    )
+    min_lat = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    min_lng = serializers.FloatField(required=False, min_value=-180, max_value=180)
+    max_lat = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    max_lng = serializers.FloatField(required=False, min_value=-180, max_value=180)
+
+    BBOX = ("min_lat", "min_lng", "max_lat", "max_lng")
+
+    def validate(self, data):
+        if all(key in data for key in self.BBOX):
+            if data["min_lat"] > data["max_lat"] or data["min_lng"] > data["max_lng"]:
+                raise serializers.ValidationError("min should be smaller than max")
+            if (
+                data["max_lat"] - data["min_lat"] > self.MAX_BBOX_DEGREES
+                or data["max_lng"] - data["min_lng"] > self.MAX_BBOX_DEGREES
+            ):
+                raise serializers.ValidationError(
+                    f"bbox should be within {self.MAX_BBOX_DEGREES} degrees"
+                )
+            data["bbox"] = tuple(data[key] for key in self.BBOX)
+            data["lat"] = (data["min_lat"] + data["max_lat"]) / 2
+            data["lng"] = (data["min_lng"] + data["max_lng"]) / 2
+            data["radius"] = None
+        elif "lat" in data and "lng" in data:
+            data["bbox"] = geo.bbox_around(data["lat"], data["lng"], data["radius"])
+        else:
+            raise serializers.ValidationError(
+                "lat and lng, or min_lat, min_lng, max_lat and max_lng are required"
+            )
+        return data
+
+    def nearest(self, queryset, limit):
+        data = self.validated_data
+        return geo.nearest(
+            queryset,
+            data["lat"],
+            data["lng"],
+            data["bbox"],
+            radius_km=data["radius"],
+            limit=limit,
+        )
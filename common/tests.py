@@ -1,3 +1,111 @@
-from django.test import TestCase
+from rest_framework.test import APITestCase
+from django.core.cache import cache as django_cache
+from categories.models import Category
+from rooms.models import Amenity, Room
+from users.models import User
+from . import counters, refdata
 
-# Create your tests here.
+
+class TestBufferedCounter(APITestCase):
+    def setUp(self):
+        owner = User.objects.create(username="owner", is_staff=True)
+        self.room = Room.objects.create(
+            name="room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=owner,
+        )
+        self.counter = counters.BufferedCounter(
+            "test_views",
+            Room,
+            ["view_count"],
+            flush_threshold=3,
+            flush_seconds=60,
+        )
+        self.addCleanup(counters._registry.pop, "test_views")
+        self.client.force_authenticate(owner)
+
+    def view_count(self):
+        self.room.refresh_from_db()
+        return self.room.view_count
+
+    def test_threshold(self):
+        self.counter.add(self.room.pk, view_count=1)
+        self.counter.add(self.room.pk, view_count=1)
+        self.assertFalse(self.counter.should_flush())
+        self.counter.add(self.room.pk, view_count=1)
+        self.assertTrue(self.counter.should_flush())
+        self.counter.flush()
+        self.assertEqual(self.view_count(), 3)
+
+    def test_final_flush(self):
+        self.counter.add(self.room.pk, view_count=2)
+        counters.stop()
+        self.assertEqual(self.view_count(), 2)
+        self.assertEqual(self.counter.pending(), 0)
+
+    def test_never_below_zero(self):
+        self.counter.add(self.room.pk, view_count=-5)
+        self.counter.flush()
+        self.assertEqual(self.view_count(), 0)
+
+    def test_backlog_metric(self):
+        self.counter.add(self.room.pk, view_count=1)
+        self.counter.add(self.room.pk + 1, view_count=1)
+        sources = self.client.get("/api/v1/metrics").json()["sources"]
+        self.assertEqual(sources["counters"]["test_views"]["pending"], 2)
+        self.assertEqual(sources["counters"]["test_views"]["rows"], 2)
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            self.counter.add(self.room.pk, save_count=1)
+
+
+class TestReferenceCache(APITestCase):
+
+    URL = "/api/v1/rooms/amenities/"
+
+    def setUp(self):
+        django_cache.clear()
+        refdata.amenities.clear()
+        Amenity.objects.create(name="wifi")
+
+    def test_served_from_memory(self):
+        self.assertEqual(len(self.client.get(self.URL).json()), 1)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.URL)
+        self.assertEqual(response.json(), [{"name": "wifi", "description": None}])
+        self.assertEqual(refdata.amenities.stats()["hit_rate"], 0.5)
+
+    def test_write_bumps_version(self):
+        etag = self.client.get(self.URL)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Amenity.objects.create(name="parking")
+        response = self.client.get(self.URL)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_version_bumped_after_commit(self):
+        version = refdata.amenities.version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            Amenity.objects.create(name="parking")
+            self.assertEqual(refdata.amenities.version(), version)
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertEqual(refdata.amenities.version(), version + 1)
+
+    def test_not_modified(self):
+        etag = self.client.get(self.URL)["ETag"]
+        response = self.client.get(self.URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_categories(self):
+        Category.objects.create(name="food", kind=Category.CategoryKindChoices.ROOMS)
+        response = self.client.get("/api/v1/categories/")
+        self.assertEqual(response.json(), [{"name": "food", "kind": "rooms"}])
+        self.assertTrue(response["ETag"].startswith('"categories-'))
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_asgi_application()
+
+# buffered counters (common/counters.py) are written by a background thread
+# in serving processes, with a final flush when the worker exits
+from common import counters  # noqa: E402
+
+counters.start()
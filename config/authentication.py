@@ -1,8 +1,15 @@
 import jwt
 from django.conf import settings
-from rest_framework.authentication import BaseAuthentication
+from rest_framework.authentication import (
+    BaseAuthentication,
+    SessionAuthentication,
+    TokenAuthentication,
+)
 from rest_framework.exceptions import AuthenticationFailed
-from users.models import User
+from users.models import AuthToken, User
+from users.cache import get_token_user, get_user
+from users import tokens
+from common import metrics
 
 # authentication class > authenticate function run and return (user, None) or None > views.py class
 class TrustMeBroAuthentication(BaseAuthentication):
@@ -11,7 +18,7 @@ class TrustMeBroAuthentication(BaseAuthentication):
         if not username:
             return None
         try:
-            user = User.objects.get(username=username)
+            user = get_user(username=username)
             return (user, None)  # user first tuple return this is rule
         except User.DoesNotExist:
             raise AuthenticationFailed(f"No user {username}")
@@ -22,19 +29,79 @@ class JWTAuthentication(BaseAuthentication):
         token = request.headers.get("Jwt")
         if not token:
             return None
-        decoded = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=["HS256"],
-        )
-        pk = decoded.get("pk")
-        if not pk:
+        try:
+            # exp, type, 메모리의 revocation set 까지 확인 (DB 안 읽음)
+            decoded = tokens.decode(token, tokens.ACCESS)
+        except jwt.InvalidTokenError:
             raise AuthenticationFailed("Invaild Token")
+        pk = decoded["pk"]
         try:
-            user = User.objects.get(pk=pk)
-            return (user, None)
+            # users.cache 에 있으면 DB 를 안 읽음, User 저장시 signal 로 지워짐
+            user = get_user(pk=pk)
         except User.DoesNotExist:
             raise AuthenticationFailed("User Not Found")
+        if not user.is_active:
+            raise AuthenticationFailed("User inactive")
+        return (user, decoded)
+
+
+class HashedTokenAuthentication(TokenAuthentication):
+
+    """Authorization: Token <key>, checked against users.AuthToken digests"""
+
+    def authenticate_credentials(self, key):
+        try:
+            user = get_token_user(key)
+        except AuthToken.DoesNotExist:
+            raise AuthenticationFailed("Invalid token.")
+        if not user.is_active:
+            raise AuthenticationFailed("User inactive or deleted.")
+        return (user, key)
+
+
+class HeaderAuthentication(BaseAuthentication):
+
+    """
+    the only DEFAULT_AUTHENTICATION_CLASSES entry, picks one backend from the headers.
+    예전처럼 Session > TrustMe > Token > JWT 를 차례로 돌리지 않음.
+    Session 은 다른 header 가 없고 session cookie 가 있을 때만 써서,
+    token 으로 오는 요청은 session table 을 읽지 않음 (session 은 lazy 라 안 건드리면 안 읽음)
+    """
+
+    authorization_backends = {
+        "token": HashedTokenAuthentication,
+    }
+    header_backends = {
+        "Jwt": JWTAuthentication,
+        "Trust-Me": TrustMeBroAuthentication,
+    }
+
+    def get_scheme(self, request):
+        authorization = request.headers.get("Authorization", "").split(maxsplit=1)
+        if authorization and authorization[0].lower() in self.authorization_backends:
+            return authorization[0].lower()
+        for header in self.header_backends:
+            if header in request.headers:
+                return header
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return "session"
+        return None
+
+    def get_backend(self, scheme):
+        if scheme == "session":
+            return SessionAuthentication()
+        if scheme in self.authorization_backends:
+            return self.authorization_backends[scheme]()
+        return self.header_backends[scheme]()
+
+    def authenticate(self, request):
+        scheme = self.get_scheme(request)
+        if scheme is None:
+            return None
+        name = scheme.lower()
+        metrics.incr(f"auth.{name}")
+        with metrics.timer(f"auth.{name}"):
+            return self.get_backend(scheme).authenticate(request)
 
 
 # token authentocation recommend > django rest knox
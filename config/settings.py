@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 import os
 import environ
@@ -155,11 +156,62 @@ MEDIA_URL = "user-uploads/"
 
 PAGE_SIZE = 3
 
+MAX_PAGE_SIZE = 50
+
+CALENDAR_CACHE_TIMEOUT = 60 * 5
+
+# experiences/schedule.py, days of ExperienceSlot kept ahead of today
+EXPERIENCE_SLOT_HORIZON_DAYS = 60
+
+# rooms embedded per wishlist in GET api/v1/wishlists/, the rest is paginated
+WISHLIST_PREVIEW_ROOMS = 3
+
+# common/counters.py, how often the flush thread of a serving worker looks
+COUNTER_FLUSH_POLL_SECONDS = 1
+
+# rooms/popularity.py, buffered per worker, written when either is reached
+POPULARITY_FLUSH_THRESHOLD = 100
+
+POPULARITY_FLUSH_SECONDS = 10
+
+TRENDING_HALF_LIFE = timedelta(days=7)
+
+# users/cache.py, per worker
+USER_CACHE_SIZE = 1024
+
+USER_CACHE_TTL = 60
+
+TOKEN_CACHE_SIZE = 4096
+
+# also how long a revocation stays in the shared cache for the other workers
+TOKEN_CACHE_TTL = 60
+
+# users/tokens.py
+JWT_ACCESS_LIFETIME = timedelta(minutes=5)
+
+JWT_REFRESH_LIFETIME = timedelta(days=14)
+
+JWT_REVOCATION_SYNC_SECONDS = 30
+
+# AuthToken digest = HMAC(TOKEN_HASH_KEY, key), changing it logs every token out
+TOKEN_HASH_KEY = env("TOKEN_HASH_KEY", default=SECRET_KEY)
+
 REST_FRAMEWORK = {
+    # Session, Trust-Me, Token, JWT > one is chosen by the request headers
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.SessionAuthentication",
-        "config.authentication.TrustMeBroAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
-        "config.authentication.JWTAuthentication",
-    ]
+        "config.authentication.HeaderAuthentication",
+    ],
+    # users/throttles.py, log in and change password
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": "20/min",
+        "login_username": "10/min",
+    },
 }
+
+# ModelBackend with the password hashing under the limit below (users/backends.py)
+AUTHENTICATION_BACKENDS = ["users.backends.LimitedModelBackend"]
+
+# users/passwords.py, concurrent PBKDF2 calls per worker / how many may wait
+PASSWORD_HASH_WORKERS = 2
+
+PASSWORD_HASH_QUEUE = 16
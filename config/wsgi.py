@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+# buffered counters (common/counters.py) are written by a background thread
+# in serving processes, with a final flush when the worker exits
+from common import counters  # noqa: E402
+
+counters.start()
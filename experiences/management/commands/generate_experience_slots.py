@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from experiences import schedule
+from experiences.models import Experience
+
+
+class Command(BaseCommand):
+
+    help = "Create the missing ExperienceSlot rows up to EXPERIENCE_SLOT_HORIZON_DAYS (run daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "experiences",
+            nargs="*",
+            type=int,
+            help="experience pks (default: every experience)",
+        )
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="also drop unbooked slots that no longer match the schedule",
+        )
+
+    def handle(self, *args, **options):
+        experiences = Experience.objects.all()
+        if options["experiences"]:
+            experiences = experiences.filter(pk__in=options["experiences"])
+        if options["sync"]:
+            attempted = deleted = 0
+            for experience in experiences.iterator():
+                counts = schedule.sync(experience)
+                attempted += counts[0]
+                deleted += counts[1]
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{attempted} missing slots inserted (attempted), {deleted} deleted"
+                )
+            )
+        else:
+            attempted = schedule.extend(experiences)
+            self.stdout.write(
+                self.style.SUCCESS(f"{attempted} missing slots inserted (attempted)")
+            )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from experiences.models import Experience
+
+
+class Command(BaseCommand):
+
+    help = "Recompute Experience rating columns (sum, count, histogram) from reviews.Review"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "experiences",
+            nargs="*",
+            type=int,
+            help="experience pks to rebuild (default: every experience)",
+        )
+
+    def handle(self, *args, **options):
+        experiences = Experience.objects.all()
+        if options["experiences"]:
+            experiences = experiences.filter(pk__in=options["experiences"])
+        updated = experiences.rebuild_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt ratings for {updated} experiences")
+        )
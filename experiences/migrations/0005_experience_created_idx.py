@@ -0,0 +1,22 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0004_experience_experience_max_team'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='experience',
+            name='experience_max_team',
+            field=models.PositiveBigIntegerField(default=None, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['created_at', 'id'], name='experience_created_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0005_experience_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='experience',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='experience',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='experience',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:15
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def backfill_slots(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    ExperienceSlot = apps.get_model("experiences", "ExperienceSlot")
+    booked = (
+        Booking.objects.filter(experience__isnull=False, experience_time__isnull=False)
+        .values("experience", "experience__experience_max_team", "experience_time")
+        .annotate(teams=Count("pk"))
+        .order_by()
+    )
+    ExperienceSlot.objects.bulk_create(
+        [
+            ExperienceSlot(
+                experience_id=row["experience"],
+                starts_at=row["experience_time"],
+                capacity=row["experience__experience_max_team"],
+                reserved=row["teams"],
+            )
+            for row in booked
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0006_roomnight_room_night_unique"),
+        ('experiences', '0006_experience_latitude_longitude_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExperienceSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('starts_at', models.DateTimeField()),
+                ('capacity', models.PositiveIntegerField(blank=True, null=True)),
+                ('reserved', models.PositiveIntegerField(default=0)),
+                ('experience', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='experiences.experience')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='experienceslot',
+            constraint=models.UniqueConstraint(fields=('experience', 'starts_at'), name='experienceslot_experience_starts_at_unique'),
+        ),
+        migrations.RunPython(backfill_slots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0007_experienceslot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['country', 'city', 'price'], name='experience_location_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['category', 'price'], name='experience_category_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['price'], name='experience_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['start', 'end'], name='experience_start_end_idx'),
+        ),
+    ]
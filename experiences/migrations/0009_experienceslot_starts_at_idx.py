@@ -0,0 +1,39 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:32
+
+from datetime import date, datetime, timedelta
+from django.conf import settings
+from django.db import migrations, models
+
+
+def generate_slots(apps, schema_editor):
+    # experiences.schedule.extend() with the historical models
+    Experience = apps.get_model("experiences", "Experience")
+    ExperienceSlot = apps.get_model("experiences", "ExperienceSlot")
+    today = date.today()
+    days = getattr(settings, "EXPERIENCE_SLOT_HORIZON_DAYS", 60)
+    slots = []
+    for experience in Experience.objects.only("pk", "start", "experience_max_team"):
+        slots += [
+            ExperienceSlot(
+                experience_id=experience.pk,
+                starts_at=datetime.combine(today + timedelta(days=day), experience.start),
+                capacity=experience.experience_max_team,
+            )
+            for day in range(days)
+        ]
+    ExperienceSlot.objects.bulk_create(slots, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0008_experience_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='experienceslot',
+            index=models.Index(fields=['starts_at', 'id'], name='experienceslot_starts_at_idx'),
+        ),
+        migrations.RunPython(generate_slots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_ratings(apps, schema_editor):
+    Experience = apps.get_model('experiences', 'Experience')
+    Review = apps.get_model('reviews', 'Review')
+
+    def total(reviews, aggregate):
+        return Coalesce(
+            Subquery(reviews.annotate(total=aggregate).values('total')),
+            Value(0),
+        )
+
+    reviews = (
+        Review.objects.filter(experience=OuterRef('pk')).order_by().values('experience')
+    )
+    updates = {
+        'rating_sum': total(reviews, Sum('rating')),
+        'rating_count': total(reviews, Count('pk')),
+    }
+    for star in range(1, 6):
+        updates[f'rating_{star}'] = total(reviews.filter(rating=star), Count('pk'))
+    Experience.objects.update(**updates)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0009_experienceslot_starts_at_idx'),
+        ('reviews', '0003_review_room_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='experience',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='experience',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='experience',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='experience',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='experience',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='experience',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='experience',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,17 @@
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
-from common.models import CommonModel
+from django.db.models import F, Q
+from django.utils import timezone
+from common.models import CommonModel, GeoModel, RatingModel, RatingQuerySet
 
 
-class Experience(CommonModel):
+class ExperienceQuerySet(RatingQuerySet):
+
+    review_field = "experience"
+
+
+class Experience(CommonModel, GeoModel, RatingModel):
 
     """Experience Model Definiiton"""
 
@@ -42,9 +51,36 @@ class Experience(CommonModel):
     )
     experience_max_team = models.PositiveBigIntegerField(default=None, null=True)
 
+    objects = ExperienceQuerySet.as_manager()
+
     def __str__(self) -> str:
         return self.name
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"],
+                name="experience_created_idx",
+            ),
+            # catalog: 위치(+가격), 카테고리(+가격), 가격 범위만, 시작 시간대
+            models.Index(
+                fields=["country", "city", "price"],
+                name="experience_location_price_idx",
+            ),
+            models.Index(
+                fields=["category", "price"],
+                name="experience_category_price_idx",
+            ),
+            models.Index(
+                fields=["price"],
+                name="experience_price_idx",
+            ),
+            models.Index(
+                fields=["start", "end"],
+                name="experience_start_end_idx",
+            ),
+        ]
+
 
 class Perk(CommonModel):
 
@@ -65,3 +101,86 @@ class Perk(CommonModel):
 
     def __str__(self) -> str:
         return self.name
+
+
+class ExperienceSlotQuerySet(models.QuerySet):
+    def reserve(self, experience, starts_at):
+        """
+        take one team from the slot, False if it is booked up.
+        ExperienceSlot.DoesNotExist if the experience has no session at starts_at.
+        조건부 UPDATE 한 줄이라 COUNT 후 INSERT 사이에 끼어드는 요청이 없음
+        """
+        if starts_at.time() != experience.start:
+            raise self.model.DoesNotExist
+        horizon_end = timezone.now().date() + timedelta(
+            days=settings.EXPERIENCE_SLOT_HORIZON_DAYS
+        )
+        if starts_at.date() < horizon_end:
+            # horizon 안쪽 slot 은 schedule 이 만들어둠, 없으면 없는 session
+            slot = self.get(experience=experience, starts_at=starts_at)
+        else:
+            # ExperienceSlots 가 빈 slot 으로 보여주는 horizon 뒤 날짜
+            slot, _ = self.get_or_create(
+                experience=experience,
+                starts_at=starts_at,
+                defaults={"capacity": experience.experience_max_team},
+            )
+        return bool(
+            self.filter(pk=slot.pk)
+            .filter(Q(capacity__isnull=True) | Q(reserved__lt=F("capacity")))
+            .update(reserved=F("reserved") + 1)
+        )
+
+    def release(self, experience_pk, starts_at):
+        return self.filter(
+            experience_id=experience_pk,
+            starts_at=starts_at,
+            reserved__gt=0,
+        ).update(reserved=F("reserved") - 1)
+
+
+class ExperienceSlot(CommonModel):
+
+    """
+    One session of an Experience and how many teams booked it.
+    capacity None = no limit (experience_max_team is not set)
+    """
+
+    experience = models.ForeignKey(
+        "experiences.Experience",
+        on_delete=models.CASCADE,
+        related_name="slots",
+    )
+    starts_at = models.DateTimeField()
+    capacity = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+    )
+    reserved = models.PositiveIntegerField(
+        default=0,
+    )
+
+    objects = ExperienceSlotQuerySet.as_manager()
+
+    def __str__(self) -> str:
+        return f"{self.experience} / {self.starts_at}"
+
+    def remaining(self):
+        if self.capacity is None:
+            return None
+        return max(self.capacity - self.reserved, 0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["experience", "starts_at"],
+                name="experienceslot_experience_starts_at_unique",
+            ),
+        ]
+        indexes = [
+            # open sessions between dates, every experience (experiences/schedule.py)
+            models.Index(
+                fields=["starts_at", "id"],
+                name="experienceslot_starts_at_idx",
+            ),
+        ]
@@ -0,0 +1,103 @@
+"""
+materialized ExperienceSlot rows over a rolling horizon
+
+Experience 는 매일 start 에 시작하는 일정이라, 오늘부터 EXPERIENCE_SLOT_HORIZON_DAYS 일 동안의
+slot 을 미리 만들어두고 "기간 안의 열린 session" 을 (starts_at, id) index 로 바로 읽음.
+  - Experience 가 저장되면 (experiences/signals.py) sync() 로 그 experience 만 맞춰줌
+    (start 가 바뀌면 예약 없는 옛 시간 slot 은 지우고 새 시간 slot 을 만듦, capacity 도 갱신)
+  - 하루가 지나면 horizon 끝에 하루치가 모자라니
+    `python manage.py generate_experience_slots` 를 매일 돌릴 것
+예약이 있는 slot 은 시간이 바뀌어도 지우지 않음 (예약이 그 시간을 가리키고 있음).
+"""
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import Experience, ExperienceSlot
+
+
+def horizon(today=None):
+    """(first day, last day)"""
+    today = today or timezone.now().date()
+    return today, today + timedelta(days=settings.EXPERIENCE_SLOT_HORIZON_DAYS - 1)
+
+
+def session_times(experience, first, last):
+    return [
+        datetime.combine(first + timedelta(days=day), experience.start)
+        for day in range((last - first).days + 1)
+    ]
+
+
+def sync(experience, today=None):
+    """
+    slots of one experience match its current schedule, returns (attempted, deleted).
+    attempted = missing slots inserted with ignore_conflicts, a concurrent run may
+    have added some of them first
+    """
+    first, last = horizon(today)
+    wanted = set(session_times(experience, first, last))
+    start_of_first = datetime.combine(first, datetime.min.time())
+    with transaction.atomic():
+        future = ExperienceSlot.objects.filter(
+            experience=experience,
+            starts_at__gte=start_of_first,
+        )
+        future.update(capacity=experience.experience_max_team)
+        existing = {
+            starts_at: reserved
+            for starts_at, reserved in future.values_list("starts_at", "reserved")
+        }
+        stale = [
+            starts_at
+            for starts_at, reserved in existing.items()
+            if starts_at not in wanted and not reserved
+        ]
+        deleted = 0
+        if stale:
+            deleted, _ = future.filter(starts_at__in=stale).delete()
+        attempted = ExperienceSlot.objects.bulk_create(
+            [
+                ExperienceSlot(
+                    experience=experience,
+                    starts_at=starts_at,
+                    capacity=experience.experience_max_team,
+                )
+                for starts_at in sorted(wanted - set(existing))
+            ],
+            ignore_conflicts=True,
+        )
+    return len(attempted), deleted
+
+
+def extend(experiences=None, today=None, chunk_size=100):
+    """
+    adds the missing slots up to the horizon, returns how many were attempted
+    (ignore_conflicts 라서 동시에 돈 다른 run 이 먼저 넣은 것도 포함될 수 있음)
+    """
+    first, last = horizon(today)
+    if experiences is None:
+        experiences = Experience.objects.all()
+    experiences = list(experiences.only("pk", "start", "experience_max_team"))
+    attempted = 0
+    for offset in range(0, len(experiences), chunk_size):
+        chunk = experiences[offset : offset + chunk_size]
+        existing = set(
+            ExperienceSlot.objects.filter(
+                experience__in=chunk,
+                starts_at__gte=datetime.combine(first, datetime.min.time()),
+            ).values_list("experience_id", "starts_at")
+        )
+        slots = [
+            ExperienceSlot(
+                experience=experience,
+                starts_at=starts_at,
+                capacity=experience.experience_max_team,
+            )
+            for experience in chunk
+            for starts_at in session_times(experience, first, last)
+            if (experience.pk, starts_at) not in existing
+        ]
+        ExperienceSlot.objects.bulk_create(slots, ignore_conflicts=True)
+        attempted += len(slots)
+    return attempted
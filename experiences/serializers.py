@@ -1,6 +1,6 @@
 from rest_framework.serializers import ModelSerializer
 from rest_framework import serializers
-from .models import Perk, Experience
+from .models import Perk, Experience, ExperienceSlot
 
 
 class PerkSerializer(serializers.ModelSerializer):
@@ -17,6 +17,80 @@ class ExperienceSerializer(serializers.ModelSerializer):
             "city",
             "country",
             "price",
+            "address",
+            "start",
+            "end",
+            "description",
+            "experience_max_team",
+        )
+
+
+class ExperienceListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Experience
+        fields = (
+            "pk",
+            "name",
+            "city",
+            "country",
+            "price",
+            "start",
+            "end",
+        )
+
+
+class ExperienceSearchSerializer(serializers.Serializer):
+
+    """
+    query params of GET api/v1/experiences/
+    start_after / start_before / end_before / end_after are times of day (HH:MM)
+    """
+
+    min_price = serializers.IntegerField(required=False, min_value=0)
+    max_price = serializers.IntegerField(required=False, min_value=0)
+    city = serializers.CharField(required=False)
+    country = serializers.CharField(required=False)
+    category = serializers.IntegerField(required=False, min_value=1)
+    perks = serializers.CharField(required=False)  # "1,2,3"
+    start_after = serializers.TimeField(required=False)
+    start_before = serializers.TimeField(required=False)
+    end_after = serializers.TimeField(required=False)
+    end_before = serializers.TimeField(required=False)
+
+    def validate_perks(self, value):
+        try:
+            return sorted({int(pk) for pk in value.split(",") if pk.strip()})
+        except ValueError:
+            raise serializers.ValidationError("perks should be comma separated ids")
+
+    def validate(self, data):
+        for low, high in (
+            ("min_price", "max_price"),
+            ("start_after", "start_before"),
+            ("end_after", "end_before"),
+        ):
+            if low in data and high in data and data[low] > data[high]:
+                raise serializers.ValidationError(
+                    f"{low} should be smaller than {high}"
+                )
+        return data
+
+
+class ExperienceMapSerializer(serializers.ModelSerializer):
+
+    distance = serializers.FloatField(read_only=True)  # km, set by common.geo
+
+    class Meta:
+        model = Experience
+        fields = (
+            "pk",
+            "name",
+            "city",
+            "country",
+            "price",
+            "latitude",
+            "longitude",
+            "distance",
         )
 
 
@@ -24,3 +98,30 @@ class ExperienceDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Experience
         fields = "__all__"
+        # perks 는 view 에서 common.assignment 로 한번에 바꿈
+        read_only_fields = ("perks",)
+
+
+class ExperienceSlotSerializer(serializers.ModelSerializer):
+
+    remaining = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExperienceSlot
+        fields = (
+            "starts_at",
+            "capacity",
+            "reserved",
+            "remaining",
+        )
+
+    def get_remaining(self, slot):
+        return slot.remaining()
+
+
+class ExperienceSessionSerializer(ExperienceSlotSerializer):
+
+    experience = ExperienceListSerializer(read_only=True)
+
+    class Meta(ExperienceSlotSerializer.Meta):
+        fields = ("pk",) + ExperienceSlotSerializer.Meta.fields + ("experience",)
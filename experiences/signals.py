@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from . import schedule
+from .models import Experience
+
+
+@receiver(post_save, sender=Experience)
+def sync_slots(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule.sync(instance)
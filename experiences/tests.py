@@ -1,3 +1,338 @@
-from django.test import TestCase
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from users.models import User
+from bookings.models import Booking
+from categories.models import Category
+from common import refdata
+from .models import Experience, ExperienceSlot, Perk
+from . import schedule
 
-# Create your tests here.
+
+class TestExperienceSlots(APITestCase):
+
+    SESSION = "2030-01-10T10:00:00"
+
+    def setUp(self):
+        self.host = User.objects.create(username="host")
+        self.experience = Experience.objects.create(
+            name="surfing",
+            host=self.host,
+            price=100,
+            address="address",
+            start=time(10),
+            end=time(12),
+            description="desc",
+            experience_max_team=2,
+        )
+        self.client.force_authenticate(self.host)
+
+    def book(self, experience_time=SESSION):
+        return self.client.post(
+            f"/api/v1/experiences/{self.experience.pk}/bookings",
+            {"experience_time": experience_time, "guests": 1},
+        )
+
+    def test_capacity(self):
+        self.assertEqual(self.book().status_code, 200)
+        self.assertEqual(self.book().status_code, 200)
+        self.assertEqual(self.book().status_code, 400)
+        self.assertEqual(Booking.objects.count(), 2)
+        self.assertEqual(ExperienceSlot.objects.get(starts_at=self.SESSION).reserved, 2)
+
+    def test_no_session_rejected(self):
+        response = self.book("2030-01-10T11:00:00")
+        self.assertEqual(response.status_code, 400)
+        # horizon 안인데 slot 이 없는 시간
+        tomorrow = datetime.combine(timezone.now().date() + timedelta(days=1), time(10))
+        self.experience.slots.filter(starts_at=tomorrow).delete()
+        self.assertEqual(self.book(tomorrow.isoformat()).status_code, 400)
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(
+            self.experience.slots.filter(starts_at__time=time(11)).exists()
+        )
+        self.assertFalse(self.experience.slots.filter(starts_at=tomorrow).exists())
+
+    def test_delete_releases(self):
+        booking_pk = self.book().json()["pk"]
+        self.client.delete(
+            f"/api/v1/experiences/{self.experience.pk}/bookings/{booking_pk}"
+        )
+        self.assertEqual(ExperienceSlot.objects.get(starts_at=self.SESSION).reserved, 0)
+
+    def test_calendar(self):
+        self.book()
+        slots = self.client.get(
+            f"/api/v1/experiences/{self.experience.pk}/slots",
+            {"start": "2030-01-09", "end": "2030-01-11"},
+        ).json()
+        self.assertEqual(
+            [(slot["starts_at"], slot["remaining"]) for slot in slots],
+            [
+                ("2030-01-09T10:00:00", 2),
+                ("2030-01-10T10:00:00", 1),
+                ("2030-01-11T10:00:00", 2),
+            ],
+        )
+
+
+class TestExperienceCatalog(APITestCase):
+
+    URL = "/api/v1/experiences/"
+
+    def setUp(self):
+        host = User.objects.create(username="host")
+        self.food = Category.objects.create(
+            name="food",
+            kind=Category.CategoryKindChoices.EXPERIENCES,
+        )
+        self.guide = Perk.objects.create(name="guide")
+        self.lunch = Perk.objects.create(name="lunch")
+        experiences = [
+            ("market", "서울", 30000, time(9), time(11), self.food, [self.guide]),
+            ("cooking", "서울", 60000, time(14), time(17), self.food, [self.lunch]),
+            ("surfing", "부산", 50000, time(10), time(12), None, [self.guide]),
+        ]
+        for name, city, price, start, end, category, perks in experiences:
+            experience = Experience.objects.create(
+                name=name,
+                city=city,
+                host=host,
+                price=price,
+                address="address",
+                start=start,
+                end=end,
+                description="desc",
+                category=category,
+            )
+            experience.perks.set(perks)
+
+    def names(self, params):
+        data = self.client.get(self.URL, params).json()
+        return sorted(experience["name"] for experience in data["results"])
+
+    def test_public_filters(self):
+        self.assertEqual(self.names({"city": "서울"}), ["cooking", "market"])
+        self.assertEqual(self.names({"max_price": 50000}), ["market", "surfing"])
+        self.assertEqual(self.names({"category": self.food.pk}), ["cooking", "market"])
+        self.assertEqual(self.names({"perks": self.guide.pk}), ["market", "surfing"])
+        self.assertEqual(
+            self.names({"start_after": "09:30", "end_before": "12:00"}),
+            ["surfing"],
+        )
+
+    def test_facets(self):
+        facets = self.client.get(self.URL, {"city": "서울"}).json()["facets"]
+        self.assertEqual(
+            facets["city"],
+            [{"city": "서울", "count": 2}, {"city": "부산", "count": 1}],
+        )
+        self.assertEqual(
+            [hour["hour"] for hour in facets["start_hour"]],
+            [9, 14],
+        )
+        self.assertEqual(
+            {perk["name"]: perk["count"] for perk in facets["perks"]},
+            {"guide": 1, "lunch": 1},
+        )
+
+    def test_pagination(self):
+        data = self.client.get(self.URL, {"page_size": 2}).json()
+        self.assertEqual(len(data["results"]), 2)
+        data = self.client.get(self.URL, {"cursor": data["next"]}).json()
+        self.assertEqual(len(data["results"]), 1)
+        self.assertNotIn("facets", data)
+
+    def test_invalid_params(self):
+        response = self.client.get(
+            self.URL, {"start_after": "18:00", "start_before": "09:00"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class TestExperienceSchedule(APITestCase):
+
+    URL = "/api/v1/experiences/sessions"
+
+    def setUp(self):
+        self.host = User.objects.create(username="host")
+        self.experience = Experience.objects.create(
+            name="surfing",
+            host=self.host,
+            price=100,
+            address="address",
+            start=time(10),
+            end=time(12),
+            description="desc",
+            experience_max_team=1,
+        )
+        self.today = timezone.now().date()
+
+    def starts(self):
+        return list(
+            self.experience.slots.order_by("starts_at").values_list(
+                "starts_at", flat=True
+            )
+        )
+
+    def test_materialized_over_horizon(self):
+        starts = self.starts()
+        self.assertEqual(len(starts), settings.EXPERIENCE_SLOT_HORIZON_DAYS)
+        self.assertEqual(starts[0], datetime.combine(self.today, time(10)))
+
+        self.assertEqual(schedule.extend(today=self.today + timedelta(days=2)), 2)
+        self.assertEqual(schedule.extend(today=self.today + timedelta(days=2)), 0)
+
+    def test_start_change_keeps_booked_slots(self):
+        booked = datetime.combine(self.today + timedelta(days=3), time(10))
+        ExperienceSlot.objects.reserve(self.experience, booked)
+
+        self.experience.start = time(15)
+        self.experience.experience_max_team = 2
+        self.experience.save()
+        starts = self.starts()
+        self.assertEqual(len(starts), settings.EXPERIENCE_SLOT_HORIZON_DAYS + 1)
+        self.assertIn(booked, starts)
+        self.assertEqual(
+            {slot.time() for slot in starts if slot != booked},
+            {time(15)},
+        )
+        self.assertEqual(ExperienceSlot.objects.get(starts_at=booked).capacity, 2)
+
+    def test_open_sessions(self):
+        tomorrow = self.today + timedelta(days=1)
+        ExperienceSlot.objects.reserve(
+            self.experience,
+            datetime.combine(tomorrow, time(10)),
+        )
+        params = {
+            "start": tomorrow.isoformat(),
+            "end": (tomorrow + timedelta(days=3)).isoformat(),
+            "page_size": 2,
+        }
+        seen = []
+        while True:
+            data = self.client.get(self.URL, params).json()
+            seen += [session["starts_at"] for session in data["results"]]
+            if not data["next"]:
+                break
+            params["cursor"] = data["next"]
+        self.assertEqual(
+            seen,
+            [f"{tomorrow + timedelta(days=day)}T10:00:00" for day in (1, 2, 3)],
+        )
+        self.assertEqual(data["results"][0]["experience"]["name"], "surfing")
+
+    def test_sessions_skip_old_times(self):
+        tomorrow = self.today + timedelta(days=1)
+        booked = datetime.combine(tomorrow, time(10))
+        ExperienceSlot.objects.reserve(self.experience, booked)
+        self.experience.start = time(15)
+        self.experience.experience_max_team = 2
+        self.experience.save()
+        params = {"start": tomorrow.isoformat(), "end": tomorrow.isoformat()}
+        data = self.client.get(self.URL, params).json()
+        self.assertEqual(
+            [session["starts_at"] for session in data["results"]],
+            [f"{tomorrow}T15:00:00"],
+        )
+        slots = self.client.get(
+            f"/api/v1/experiences/{self.experience.pk}/slots", params
+        ).json()
+        self.assertEqual(
+            [slot["starts_at"] for slot in slots], [f"{tomorrow}T15:00:00"]
+        )
+
+
+class TestExperiencePerks(APITestCase):
+
+    URL = "/api/v1/experiences/"
+
+    def setUp(self):
+        django_cache.clear()
+        refdata.perks.clear()
+        self.host = User.objects.create(username="host")
+        self.category = Category.objects.create(
+            name="tour",
+            kind=Category.CategoryKindChoices.EXPERIENCES,
+        )
+        self.perks = [Perk.objects.create(name=f"perk {i}") for i in range(4)]
+        self.client.force_authenticate(self.host)
+
+    def test_create_and_replace(self):
+        response = self.client.post(
+            self.URL,
+            {
+                "name": "surfing",
+                "price": 100,
+                "address": "address",
+                "start": "10:00",
+                "end": "12:00",
+                "description": "desc",
+                "category": self.category.pk,
+                "perks": [perk.pk for perk in self.perks[:2]],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        experience = Experience.objects.get(pk=response.json()["id"])
+        self.assertEqual(
+            sorted(response.json()["perks"]),
+            [perk.pk for perk in self.perks[:2]],
+        )
+
+        response = self.client.put(
+            f"{self.URL}{experience.pk}",
+            {"perks": [self.perks[1].pk, self.perks[3].pk, 998, 999]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("998, 999", response.json()["perks"][0])
+
+        response = self.client.put(
+            f"{self.URL}{experience.pk}",
+            {"perks": [self.perks[1].pk, self.perks[3].pk]},
+            format="json",
+        )
+        self.assertEqual(
+            sorted(experience.perks.values_list("pk", flat=True)),
+            [self.perks[1].pk, self.perks[3].pk],
+        )
+
+
+class TestExperiencesNearby(APITestCase):
+
+    URL = "/api/v1/experiences/nearby"
+
+    def setUp(self):
+        host = User.objects.create(username="host")
+        places = {
+            "시청": (37.5663, 126.9779),
+            "강남역": (37.4979, 127.0276),
+            "해운대": (35.1587, 129.1604),
+        }
+        for name, (latitude, longitude) in places.items():
+            Experience.objects.create(
+                name=name,
+                host=host,
+                price=100,
+                address="address",
+                start=time(10),
+                end=time(12),
+                description="desc",
+                latitude=latitude,
+                longitude=longitude,
+            )
+
+    def test_radius_and_bbox(self):
+        data = self.client.get(
+            self.URL, {"lat": 37.5665, "lng": 126.9780, "radius": 20}
+        ).json()
+        self.assertEqual([experience["name"] for experience in data], ["시청", "강남역"])
+        self.assertLess(data[0]["distance"], data[1]["distance"])
+
+        params = {"min_lat": 35, "min_lng": 129, "max_lat": 36, "max_lng": 130}
+        data = self.client.get(self.URL, params).json()
+        self.assertEqual([experience["name"] for experience in data], ["해운대"])
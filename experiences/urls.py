@@ -6,7 +6,11 @@ from . import views
 urlpatterns = [
     path("", views.Experiences.as_view()),  # x
     path("<int:ex_pk>", views.ExperienceDetail.as_view()),  # GET PUT DELETE
+    path("nearby", views.ExperiencesNearby.as_view()),
+    path("sessions", views.ExperienceSessions.as_view()),
     path("<int:ex_pk>/bookings", views.ExperBooking.as_view()),  #
+    path("<int:ex_pk>/reviews", views.ExperienceReviews.as_view()),
+    path("<int:ex_pk>/slots", views.ExperienceSlots.as_view()),
     path(
         "<int:ex_pk>/bookings/<int:book_pk>", views.ExperienceBookingRevise.as_view()
     ),  # GET put delete
@@ -1,4 +1,7 @@
+from datetime import datetime, timedelta
 from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import ExtractHour
 from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.status import HTTP_204_NO_CONTENT
@@ -10,29 +13,37 @@ from rest_framework.exceptions import (
     NotAuthenticated,
     PermissionDenied,
 )
-from .models import Perk, Experience
+from .models import Perk, Experience, ExperienceSlot
 from categories.models import Category
 from medias.serializers import PhotoSerializer, VideoSerializer
 from .serializers import (
     PerkSerializer,
     ExperienceSerializer,
     ExperienceDetailSerializer,
+    ExperienceListSerializer,
+    ExperienceMapSerializer,
+    ExperienceSearchSerializer,
+    ExperienceSessionSerializer,
+    ExperienceSlotSerializer,
 )
 from bookings.models import Booking
+from reviews.serializers import ReviewSerializer
 from bookings.serializers import (
     CreateExperienceBookingSerializer,
     PublicBookingSerializer,
 )
 from rest_framework.response import Response
+from common import assignment, refdata
+from common.facets import FacetedSearchMixin
+from common.pagination import KeysetPagination
+from common.serializers import NearbySerializer
 
 # Create your views here.
 
 
 class Perks(APIView):
     def get(self, request):
-        all_perks = Perk.objects.all()
-        serializer = PerkSerializer(all_perks, many=True)
-        return Response(serializer.data)
+        return refdata.perks.list_response(request, PerkSerializer)
 
     def post(self, request):
         serializer = PerkSerializer(data=request.data)
@@ -70,21 +81,70 @@ class PerkDetail(APIView):
         return Response(status=HTTP_204_NO_CONTENT)
 
 
-class Experiences(APIView):  # GET POST All Experience list X
+class Experiences(FacetedSearchMixin, APIView):
+
+    """
+    GET api/v1/experiences/?city=서울&min_price=...&perks=1,2&start_after=09:00
+    public catalog, cursor paginated, facet counts on the first page (common/facets.py)
+    """
+
     permission_classes = [
-        IsAuthenticated,
+        IsAuthenticatedOrReadOnly,
     ]
 
-    def get(self, request):
+    model = Experience
+    filter_fields = ("city", "country")
+    price_bucket_size = 10000
+
+    def get_filters(self, params):
+        filters = super().get_filters(params)
+        if "category" in params:
+            filters["category"] = Q(category_id=params["category"])
+        if params.get("perks"):
+            filters["perks"] = self.has_all("perks", params["perks"])
+        self.add_range(
+            filters, "start", params.get("start_after"), params.get("start_before")
+        )
+        self.add_range(
+            filters, "end", params.get("end_after"), params.get("end_before")
+        )
+        return filters
+
+    def get_facets(self, filters):
+        facets = super().get_facets(filters)
+        facets["category"] = self.count_named(filters, "category")
+        starts = (
+            self.get_queryset(filters, exclude="start")
+            .order_by()
+            .annotate(hour=ExtractHour("start"))
+            .values("hour")
+            .annotate(count=Count("pk"))
+            .order_by("hour")
+        )
+        facets["start_hour"] = list(starts)
+        facets["perks"] = self.count_related(filters, "perks")
+        return facets
 
-        try:
-            experiences = Experience.objects.all()
-            serializer = ExperienceSerializer(
-                experiences, many=True, context={"request": request}
-            )
-            return Response(serializer.data)
-        except Experience.DoesNotExist:
-            raise NotFound
+    def get(self, request):
+        params = ExperienceSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = self.get_filters(params.validated_data)
+        data = self.paginate_with_facets(
+            request,
+            filters,
+            self.get_queryset(filters).only(
+                "pk",
+                "created_at",
+                "name",
+                "city",
+                "country",
+                "price",
+                "start",
+                "end",
+            ),
+            lambda experiences: ExperienceListSerializer(experiences, many=True).data,
+        )
+        return Response(data)
 
     def post(self, request):
 
@@ -94,33 +154,54 @@ class Experiences(APIView):  # GET POST All Experience list X
             category_pk = request.data.get("category")
             if not category_pk:
                 raise ParseError("Category is required.")
-            try:
-                category = Category.objects.get(pk=category_pk)
-                if category.kind == Category.CategoryKindChoices.ROOMS:
-                    raise ParseError("The Category kind should be 'experience'")
-            except Category.DoesNotExist:
+            category = refdata.categories.get(category_pk)
+            if category is None:
                 raise ParseError("Category Not Found")
-            try:
-                with transaction.atomic():
-                    """
-                    transaction is search error in this code
-                    transaction examine revise infomation in code
-                    if error is exist, transaction not push in DB
-                    if error isnt exist, transaction push in DB
-                    """
-                    new_experience = serializer.save(
-                        host=request.user,
-                        category=category,
-                    )
-                    perks = request.data.get("perks")
-                    for perk_pk in perks:
-                        perk = Perk.objects.get(pk=perk_pk)
-                        new_experience.perks.add(perk)
-                    return Response(serializer(new_experience).data)
-            except:
-                raise ParseError
+            if category.kind == Category.CategoryKindChoices.ROOMS:
+                raise ParseError("The Category kind should be 'experience'")
+            perks = assignment.validate(
+                refdata.perks,
+                request.data.get("perks"),
+                "perks",
+            )
+            with transaction.atomic():
+                """
+                transaction is search error in this code
+                transaction examine revise infomation in code
+                if error is exist, transaction not push in DB
+                if error isnt exist, transaction push in DB
+                """
+                new_experience = serializer.save(
+                    host=request.user,
+                    category=category,
+                )
+                assignment.assign(new_experience, "perks", perks)
+            return Response(ExperienceDetailSerializer(new_experience).data)
         else:
-            raise Response(serializer.errors)
+            return Response(serializer.errors)
+
+
+class ExperiencesNearby(APIView):
+
+    """same params as api/v1/rooms/nearby"""
+
+    def get(self, request):
+        params = NearbySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        experiences = params.nearest(
+            Experience.objects.only(
+                "pk",
+                "name",
+                "city",
+                "country",
+                "price",
+                "latitude",
+                "longitude",
+            ),
+            limit=KeysetPagination().get_page_size(request),
+        )
+        serializer = ExperienceMapSerializer(experiences, many=True)
+        return Response(serializer.data)
 
 
 class ExperienceDetail(APIView):  # GET PUT DELETE Something Experience one x
@@ -152,30 +233,29 @@ class ExperienceDetail(APIView):  # GET PUT DELETE Something Experience one x
             if "category" in request.data:
                 category_pk = request.data.get("category")
 
-                try:
-                    category = Category.objects.get(pk=category_pk)
-                    if category.kind == category.CategoryKindChoices.ROOMS:
-                        raise ParseError("Category kind should be Experience")
-                    experience.category = category
-                except Category.DoesNotExist:
+                category = refdata.categories.get(category_pk)
+                if category is None:
                     raise ParseError("Category model is not exist")
+                if category.kind == category.CategoryKindChoices.ROOMS:
+                    raise ParseError("Category kind should be Experience")
+                experience.category = category
 
+            perks = None
             if "perks" in request.data:
-                try:
-                    perks = request.data.get("perks")
-                    if perks:
-                        experience.perks.clear()
-                        for perk_pk in perks:
-                            perk = Perks.objects.get(pk=perk_pk)
-                            experience.perks.add(perk)
-
-                except Exception:
-                    raise ParseError("Perks is Not Found")
-
-            update_experience = serializer.save()
+                perks = assignment.validate(
+                    refdata.perks,
+                    request.data.get("perks"),
+                    "perks",
+                )
+
+            with transaction.atomic():
+                # 시간, 팀 수가 바뀌면 signals 에서 앞으로의 slot 을 맞춰줌 (schedule.py)
+                update_experience = serializer.save()
+                if perks is not None:
+                    assignment.assign(update_experience, "perks", perks)
             return Response(ExperienceDetailSerializer(update_experience).data)
         else:
-            raise Response(serializer.errors)
+            return Response(serializer.errors)
 
     def delete(self, request, ex_pk):
         experience = Experience.objects.get(pk=ex_pk)
@@ -183,6 +263,43 @@ class ExperienceDetail(APIView):  # GET PUT DELETE Something Experience one x
         return Response(status=HTTP_204_NO_CONTENT)
 
 
+class ExperienceReviews(APIView):
+
+    """same as api/v1/rooms/<pk>/reviews"""
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get_object(self, ex_pk):
+        try:
+            return Experience.objects.get(pk=ex_pk)
+        except Experience.DoesNotExist:
+            raise NotFound
+
+    def get(self, request, ex_pk):
+        experience = self.get_object(ex_pk)
+        paginator = KeysetPagination()
+        reviews = paginator.paginate_queryset(
+            experience.reviews.select_related("user"),
+            request,
+        )
+        serializer = ReviewSerializer(reviews, many=True)
+        data = paginator.get_paginated_data(serializer.data)
+        if not request.query_params.get(paginator.cursor_query_param):
+            data["summary"] = experience.rating_summary()
+        return Response(data)
+
+    def post(self, request, ex_pk):
+        serializer = ReviewSerializer(data=request.data)
+        if serializer.is_valid():
+            review = serializer.save(
+                user=request.user,
+                experience=self.get_object(ex_pk),
+            )
+            return Response(ReviewSerializer(review).data)
+        else:
+            return Response(serializer.errors)
+
+
 class ExperBooking(APIView):  # GET POST Create x
     permission_classes = [IsAuthenticated]
 
@@ -207,29 +324,151 @@ class ExperBooking(APIView):  # GET POST Create x
     def post(self, request, ex_pk):
 
         experience = self.get_object(ex_pk)
-        experience_time_aware_utc = request.data["experience_time"]
-        if (
-            experience.bookings.filter(
-                experience_time__exact=experience_time_aware_utc
-            ).count()
-            == experience.experience_max_team
-        ):
-            raise ParseError("Reservation be booked up")
         serializer = CreateExperienceBookingSerializer(data=request.data)
         if serializer.is_valid():
-            booking = serializer.save(
-                experience=experience,
-                user=request.user,
-                kind=Booking.BookingKindChoices.EXPERIENCE,
-                check_in=None,
-                check_out=None,
-            )
+            with transaction.atomic():
+                try:
+                    reserved = ExperienceSlot.objects.reserve(
+                        experience,
+                        serializer.validated_data["experience_time"],
+                    )
+                except ExperienceSlot.DoesNotExist:
+                    raise ParseError("No session at that time")
+                if not reserved:
+                    raise ParseError("Reservation be booked up")
+                booking = serializer.save(
+                    experience=experience,
+                    user=request.user,
+                    kind=Booking.BookingKindChoices.EXPERIENCE,
+                    check_in=None,
+                    check_out=None,
+                )
             serializer = PublicBookingSerializer(booking)
             return Response(serializer.data)
         else:
             return Response(serializer.errors)
 
 
+class DateRangeMixin:
+
+    """?start=YYYY-MM-DD&end=YYYY-MM-DD (both days included), at most MAX_DAYS apart"""
+
+    MAX_DAYS = 62
+
+    def get_range(self, request):
+        today = timezone.now().date()
+        try:
+            start = request.query_params.get("start")
+            start = datetime.strptime(start, "%Y-%m-%d").date() if start else today
+            end = request.query_params.get("end")
+            end = (
+                datetime.strptime(end, "%Y-%m-%d").date()
+                if end
+                else start + timedelta(days=30)
+            )
+        except ValueError:
+            raise ParseError("start, end should be YYYY-MM-DD")
+        if end < start or (end - start).days > self.MAX_DAYS:
+            raise ParseError(f"end should be within {self.MAX_DAYS} days after start")
+        return start, end
+
+
+class ExperienceSlots(DateRangeMixin, APIView):
+
+    """
+    GET api/v1/experiences/<ex_pk>/slots?start=2023-01-01&end=2023-01-31
+    remaining teams per session, days past the slot horizon are shown as empty slots
+    """
+
+    def get_object(self, ex_pk):
+        try:
+            return Experience.objects.get(pk=ex_pk)
+        except Experience.DoesNotExist:
+            raise NotFound
+
+    def get(self, request, ex_pk):
+        experience = self.get_object(ex_pk)
+        start, end = self.get_range(request)
+        slots = {
+            slot.starts_at: slot
+            for slot in experience.slots.filter(
+                # 예약 때문에 남겨둔 옛 시간 slot 은 빼고
+                starts_at__time=experience.start,
+                starts_at__gte=datetime.combine(start, datetime.min.time()),
+                starts_at__lt=datetime.combine(
+                    end + timedelta(days=1), datetime.min.time()
+                ),
+            )
+        }
+        for day in range((end - start).days + 1):
+            starts_at = datetime.combine(start + timedelta(days=day), experience.start)
+            if starts_at not in slots:
+                slots[starts_at] = ExperienceSlot(
+                    experience=experience,
+                    starts_at=starts_at,
+                    capacity=experience.experience_max_team,
+                )
+        serializer = ExperienceSlotSerializer(
+            [slots[starts_at] for starts_at in sorted(slots)],
+            many=True,
+        )
+        return Response(serializer.data)
+
+
+class SessionPagination(KeysetPagination):
+
+    ordering_field = "starts_at"
+    descending = False
+
+
+class ExperienceSessions(DateRangeMixin, APIView):
+
+    """
+    GET api/v1/experiences/sessions?start=2023-01-01&end=2023-01-07&city=서울
+    sessions with free teams of every experience, earliest first (cursor paginated)
+    """
+
+    MAX_DAYS = 31
+
+    def get(self, request):
+        start, end = self.get_range(request)
+        sessions = ExperienceSlot.objects.filter(
+            Q(capacity__isnull=True) | Q(reserved__lt=F("capacity")),
+            # start 가 바뀌고 예약 때문에 남아있는 옛 시간 slot 은 열린 session 이 아님
+            starts_at__time=F("experience__start"),
+            starts_at__gte=max(
+                datetime.combine(start, datetime.min.time()),
+                timezone.now(),
+            ),
+            starts_at__lt=datetime.combine(
+                end + timedelta(days=1), datetime.min.time()
+            ),
+        )
+        city = request.query_params.get("city")
+        if city:
+            sessions = sessions.filter(experience__city=city)
+        paginator = SessionPagination()
+        sessions = paginator.paginate_queryset(
+            sessions.select_related("experience").only(
+                "pk",
+                "starts_at",
+                "capacity",
+                "reserved",
+                "experience",
+                "experience__id",
+                "experience__name",
+                "experience__city",
+                "experience__country",
+                "experience__price",
+                "experience__start",
+                "experience__end",
+            ),
+            request,
+        )
+        serializer = ExperienceSessionSerializer(sessions, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
 class ExperienceBookingRevise(APIView):  # GET PUT DELETE Something Experience one
     permission_classes = [IsAuthenticated]
 
@@ -247,27 +486,28 @@ class ExperienceBookingRevise(APIView):  # GET PUT DELETE Something Experience o
 
     def put(self, request, ex_pk, book_pk):
         experience = self.get_experience_object(ex_pk)
-        experience_time_aware_utc = timezone.make_aware(
-            request.data["experience_time"]
-        ).date()
         booking = self.get_booking_object(book_pk)
-        if (
-            experience.bookings.filter(
-                experience_time__exact=experience_time_aware_utc
-            ).count()
-            == experience.experience_max_team
-        ):
-            raise ParseError("Reservation be booked up")
         serializer = CreateExperienceBookingSerializer(
             booking,
             request.data,
             partial=True,
         )
         if serializer.is_valid():
-            updated_booking = serializer.save(
-                kind=booking.BookingKindChoices.EXPERIENCE,
-                user=request.user,
-            )
+            old_time = booking.experience_time
+            new_time = serializer.validated_data.get("experience_time", old_time)
+            with transaction.atomic():
+                if new_time != old_time:
+                    try:
+                        reserved = ExperienceSlot.objects.reserve(experience, new_time)
+                    except ExperienceSlot.DoesNotExist:
+                        raise ParseError("No session at that time")
+                    if not reserved:
+                        raise ParseError("Reservation be booked up")
+                    ExperienceSlot.objects.release(experience.pk, old_time)
+                updated_booking = serializer.save(
+                    kind=booking.BookingKindChoices.EXPERIENCE,
+                    user=request.user,
+                )
             return Response(PublicBookingSerializer(updated_booking).data)
         else:
             return Response(serializer.errors)
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_alter_review_experience_alter_review_room_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['room', 'created_at', 'id'], name='review_room_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_review_room_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['experience', 'created_at', 'id'], name='review_experience_created_idx'),
+        ),
+    ]
@@ -1,7 +1,46 @@
-from django.db import models
+from collections import defaultdict
+from django.db import models, transaction
 from common.models import CommonModel
 
 
+class ReviewQuerySet(models.QuerySet):
+
+    """bulk paths skip save() signals, so room/experience ratings are fixed up here"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            reviews = super().bulk_create(objs, *args, **kwargs)
+            ratings = defaultdict(list)
+            for review in reviews:
+                for rated in review.rated():
+                    ratings[rated].append(review.rating)
+            for (model, pk), values in ratings.items():
+                model.objects.filter(pk=pk).add_ratings(values)
+        return reviews
+
+    def update(self, **kwargs):
+        from rooms.models import Room
+        from experiences.models import Experience
+
+        fields = {"rating", "room", "room_id", "experience", "experience_id"}
+        if not fields & kwargs.keys():
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            before = list(self.values_list("pk", "room", "experience"))
+            rows = super().update(**kwargs)
+            # 옮겨가기 전과 후의 room / experience 모두 다시 계산
+            rated = before + list(
+                Review.objects.filter(pk__in=[pk for pk, _, _ in before]).values_list(
+                    "pk", "room", "experience"
+                )
+            )
+            room_pks = {room for _, room, _ in rated if room}
+            experience_pks = {experience for _, _, experience in rated if experience}
+            Room.objects.filter(pk__in=room_pks).rebuild_ratings()
+            Experience.objects.filter(pk__in=experience_pks).rebuild_ratings()
+        return rows
+
+
 class Review(CommonModel):
 
     """Review from a User to a Room or Experience"""
@@ -28,5 +67,32 @@ class Review(CommonModel):
     payload = models.TextField()
     rating = models.PositiveIntegerField()
 
+    objects = ReviewQuerySet.as_manager()
+
     def __str__(self) -> str:
         return f"{self.user} / {self.rating}⭐️"
+
+    def rated(self):
+        """[(model, pk)] of the room / experience this review counts for"""
+        from rooms.models import Room
+        from experiences.models import Experience
+
+        # review 는 room 이나 experience 에 달림
+        rated = []
+        if self.room_id:
+            rated.append((Room, self.room_id))
+        if self.experience_id:
+            rated.append((Experience, self.experience_id))
+        return rated
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["room", "created_at", "id"],
+                name="review_room_created_idx",
+            ),
+            models.Index(
+                fields=["experience", "created_at", "id"],
+                name="review_experience_created_idx",
+            ),
+        ]
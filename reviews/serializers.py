@@ -14,3 +14,5 @@ class ReviewSerializer(serializers.ModelSerializer):
             "payload",
             "rating",
         )
+        # 별점 분포 (rating_1 ~ rating_5) 에 들어가는 값만
+        extra_kwargs = {"rating": {"min_value": 1, "max_value": 5}}
@@ -0,0 +1,33 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Review
+
+
+@receiver(pre_save, sender=Review)
+def remember_old_rating(sender, instance, **kwargs):
+    # 수정일 때만 이전 room/experience 와 rating 을 기억해둠 (새 리뷰는 pk 가 없음)
+    instance._old_rating = None
+    if instance.pk:
+        instance._old_rating = (
+            Review.objects.filter(pk=instance.pk)
+            .only("room", "experience", "rating")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def add_rating(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, "_old_rating", None)
+    if old:
+        for model, pk in old.rated():
+            model.objects.filter(pk=pk).add_ratings([old.rating], -1)
+    for model, pk in instance.rated():
+        model.objects.filter(pk=pk).add_ratings([instance.rating])
+
+
+@receiver(post_delete, sender=Review)
+def remove_rating(sender, instance, **kwargs):
+    for model, pk in instance.rated():
+        model.objects.filter(pk=pk).add_ratings([instance.rating], -1)
@@ -1,3 +1,170 @@
+from datetime import time
+from io import StringIO
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APITestCase
+from experiences.models import Experience
+from rooms.models import Room
+from users.models import User
+from .models import Review
 
-# Create your tests here.
+
+class TestRoomRating(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="guest")
+        self.room, self.other = [
+            Room.objects.create(
+                name=name,
+                price=100,
+                rooms=1,
+                toilets=1,
+                description="desc",
+                address="address",
+                kind=Room.RoomKindChoices.ENTIRE_PLACE,
+                owner=self.user,
+            )
+            for name in ("room", "other")
+        ]
+
+    def review(self, rating, room):
+        return Review.objects.create(
+            user=self.user,
+            payload="good",
+            rating=rating,
+            room=room,
+        )
+
+    def totals(self, room):
+        room.refresh_from_db()
+        return room.rating_sum, room.rating_count
+
+    def test_save_and_delete(self):
+        review = self.review(5, self.room)
+        self.review(2, self.room)
+        self.assertEqual(self.totals(self.room), (7, 2))
+        self.assertEqual(self.room.rating(), 3.5)
+
+        # 다른 room 으로 옮기면서 별점 수정
+        review.rating = 4
+        review.room = self.other
+        review.save()
+        self.assertEqual(self.totals(self.room), (2, 1))
+        self.assertEqual(self.totals(self.other), (4, 1))
+
+        review.delete()
+        self.assertEqual(self.totals(self.other), (0, 0))
+
+    def test_bulk_paths(self):
+        Review.objects.bulk_create(
+            [
+                Review(user=self.user, payload="ok", rating=rating, room=self.room)
+                for rating in (1, 3, 5)
+            ]
+        )
+        self.assertEqual(self.totals(self.room), (9, 3))
+
+        Review.objects.filter(rating=5).update(rating=4)
+        self.assertEqual(self.totals(self.room), (8, 3))
+
+        Review.objects.filter(rating=1).update(room=self.other)
+        self.assertEqual(self.totals(self.room), (7, 2))
+        self.assertEqual(self.totals(self.other), (1, 1))
+
+    def test_rebuild_command(self):
+        self.review(4, self.room)
+        Room.objects.update(rating_sum=0, rating_count=0)
+        call_command("rebuild_room_ratings", self.room.pk, stdout=StringIO())
+        self.assertEqual(self.totals(self.room), (4, 1))
+        self.assertEqual(self.totals(self.other), (0, 0))
+
+
+class TestRatingHistogram(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="guest")
+        self.room = Room.objects.create(
+            name="room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+        self.experience = Experience.objects.create(
+            name="surfing",
+            host=self.user,
+            price=100,
+            address="address",
+            start=time(10),
+            end=time(12),
+            description="desc",
+        )
+
+    def review(self, rating, **target):
+        return Review.objects.create(
+            user=self.user,
+            payload="good",
+            rating=rating,
+            **target,
+        )
+
+    def summary(self, obj):
+        obj.refresh_from_db()
+        return obj.rating_summary()
+
+    def assertMatchesRebuild(self, obj):
+        summary = self.summary(obj)
+        type(obj).objects.filter(pk=obj.pk).rebuild_ratings()
+        self.assertEqual(summary, self.summary(obj))
+
+    def test_incremental(self):
+        five = self.review(5, room=self.room)
+        self.review(3, room=self.room)
+        self.review(4, experience=self.experience)
+        summary = self.summary(self.room)
+        self.assertEqual(summary["rating"], 4)
+        self.assertEqual(summary["histogram"], {1: 0, 2: 0, 3: 1, 4: 0, 5: 1})
+        self.assertEqual(self.summary(self.experience)["histogram"][4], 1)
+
+        # 다른 곳으로 옮기면서 별점 수정
+        five.rating = 2
+        five.room = None
+        five.experience = self.experience
+        five.save()
+        self.assertEqual(self.summary(self.room)["histogram"][5], 0)
+        self.assertEqual(self.summary(self.experience)["histogram"][2], 1)
+
+        five.delete()
+        self.assertEqual(self.summary(self.experience)["count"], 1)
+        self.assertMatchesRebuild(self.room)
+        self.assertMatchesRebuild(self.experience)
+
+    def test_bulk_paths(self):
+        Review.objects.bulk_create(
+            [
+                Review(user=self.user, payload="ok", rating=rating, room=self.room)
+                for rating in (1, 5, 5)
+            ]
+        )
+        self.assertEqual(self.summary(self.room)["histogram"][5], 2)
+        Review.objects.filter(rating=5).update(rating=4)
+        self.assertEqual(self.summary(self.room)["histogram"][4], 2)
+        self.assertMatchesRebuild(self.room)
+
+    def test_feed(self):
+        for rating in (1, 2, 3):
+            self.review(rating, experience=self.experience)
+        url = f"/api/v1/experiences/{self.experience.pk}/reviews"
+        data = self.client.get(url, {"page_size": 2}).json()
+        self.assertEqual([review["rating"] for review in data["results"]], [3, 2])
+        self.assertEqual(data["summary"]["count"], 3)
+        self.assertEqual(data["summary"]["histogram"]["1"], 1)
+
+        data = self.client.get(url, {"page_size": 2, "cursor": data["next"]}).json()
+        self.assertEqual([review["rating"] for review in data["results"]], [1])
+        self.assertNotIn("summary", data)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(url, {"payload": "bad", "rating": 6})
+        self.assertIn("rating", response.json())
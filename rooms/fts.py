@@ -0,0 +1,141 @@
+"""
+SQLite FTS5 full text index for Room (name, description, address, city)
+
+FTS5 의 unicode61 tokenizer 는 공백 단위라서 "서울역" 으로 저장된 글을 "서울" 로 못 찾음.
+그래서 한글(CJK) 은 파이썬에서 미리 bigram 으로 쪼개서 넣고 (서울역 > 서울 울역),
+검색어도 똑같이 쪼갠 뒤 phrase query 로 찾음 ("서울 울역" = 연속된 bigram).
+"""
+import re
+from django.db import connection
+
+FTS_TABLE = "rooms_room_fts"
+
+FTS_COLUMNS = ("name", "description", "address", "city")
+
+# bm25 weight, same order as FTS_COLUMNS
+FTS_WEIGHTS = (10.0, 1.0, 2.0, 5.0)
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+    f"USING fts5({', '.join(FTS_COLUMNS)}, tokenize='unicode61 remove_diacritics 2')"
+)
+
+DROP_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+WORD_RE = re.compile(r"\w+")
+
+CJK_RE = re.compile(
+    r"[\u1100-\u11ff\u3130-\u318f\u3040-\u30ff\u4e00-\u9fff\uac00-\ud7af]+"
+)
+
+
+def is_enabled():
+    return connection.vendor == "sqlite"
+
+
+def word_tokens(word):
+    """bigrams for CJK runs, the lowercased word for everything else"""
+    tokens = []
+    position = 0
+    for run in CJK_RE.finditer(word):
+        if run.start() > position:
+            tokens.append(word[position : run.start()].lower())
+        chars = run.group()
+        if len(chars) == 1:
+            tokens.append(chars)
+        else:
+            tokens += [chars[i : i + 2] for i in range(len(chars) - 1)]
+        position = run.end()
+    if position < len(word):
+        tokens.append(word[position:].lower())
+    return tokens
+
+
+def to_index_text(text):
+    return " ".join(
+        token for word in WORD_RE.findall(text or "") for token in word_tokens(word)
+    )
+
+
+def to_match_query(query):
+    # 단어마다 bigram phrase 하나, 단어끼리는 AND. 따옴표로 감싸서 FTS 문법 문자를 무력화
+    phrases = []
+    for word in WORD_RE.findall(query or ""):
+        tokens = word_tokens(word)
+        if len(tokens) == 1 and CJK_RE.fullmatch(tokens[0]) and len(tokens[0]) == 1:
+            # 한 글자 검색어는 그 글자로 시작하는 bigram 까지 prefix 로 찾음
+            phrases.append(f'"{tokens[0]}" *')
+        elif tokens:
+            phrases.append('"' + " ".join(tokens) + '"')
+    return " AND ".join(phrases)
+
+
+def index_rooms(rooms):
+    if not is_enabled():
+        return
+    rows = [
+        [room.pk] + [to_index_text(getattr(room, column)) for column in FTS_COLUMNS]
+        for room in rooms
+    ]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+            [[row[0]] for row in rows],
+        )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+            f"VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def unindex_room(pk):
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [pk])
+
+
+def rebuild_index(rooms):
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    index_rooms(rooms.iterator())
+
+
+def search(query, limit, offset=0):
+    """[(room pk, bm25 score)], best match first"""
+    match = to_match_query(query)
+    if not match or not is_enabled():
+        return []
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, bm25({FTS_TABLE}, {weights}) AS score "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY score LIMIT %s OFFSET %s",
+            [match, limit, offset],
+        )
+        return cursor.fetchall()
+
+
+def snippet(text, query, width=40):
+    """
+    원문에서 검색어 주변만 잘라서 <b></b> 로 표시, 없으면 None
+    (FTS 에는 bigram 만 들어있어서 snippet() 대신 직접 만듦)
+    """
+    text = text or ""
+    words = sorted(set(WORD_RE.findall(query or "")), key=len, reverse=True)
+    if not words:
+        return None
+    pattern = re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE)
+    found = pattern.search(text)
+    if not found:
+        return None
+    start = max(0, found.start() - width)
+    end = min(len(text), found.end() + width)
+    window = pattern.sub(lambda match: f"<b>{match.group()}</b>", text[start:end])
+    return ("…" if start else "") + window + ("…" if end < len(text) else "")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from rooms import popularity
+from rooms.models import Room
+
+
+class Command(BaseCommand):
+
+    help = "Recompute Room.save_count / booking_count and restart trending_score"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "rooms",
+            nargs="*",
+            type=int,
+            help="room pks to rebuild (default: every room)",
+        )
+
+    def handle(self, *args, **options):
+        rooms = Room.objects.all()
+        if options["rooms"]:
+            rooms = rooms.filter(pk__in=options["rooms"])
+        popularity.counter.flush()
+        updated = popularity.rebuild(rooms)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt popularity for {updated} rooms"))
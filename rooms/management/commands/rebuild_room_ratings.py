@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from rooms.models import Room
+
+
+class Command(BaseCommand):
+
+    help = "Recompute Room rating columns (sum, count, histogram) from reviews.Review"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "rooms",
+            nargs="*",
+            type=int,
+            help="room pks to rebuild (default: every room)",
+        )
+
+    def handle(self, *args, **options):
+        rooms = Room.objects.all()
+        if options["rooms"]:
+            rooms = rooms.filter(pk__in=options["rooms"])
+        updated = rooms.rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ratings for {updated} rooms"))
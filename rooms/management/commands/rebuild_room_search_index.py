@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from rooms import fts
+from rooms.models import Room
+
+
+class Command(BaseCommand):
+
+    help = "Rebuild the SQLite FTS5 room search index from every Room"
+
+    def handle(self, *args, **options):
+        if not fts.is_enabled():
+            self.stdout.write(self.style.WARNING("FTS5 index needs SQLite, skipped"))
+            return
+        fts.rebuild_index(Room.objects.only(*fts.FTS_COLUMNS))
+        self.stdout.write(self.style.SUCCESS("Rebuilt room search index"))
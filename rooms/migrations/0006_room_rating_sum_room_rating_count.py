@@ -0,0 +1,43 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_ratings(apps, schema_editor):
+    Room = apps.get_model("rooms", "Room")
+    Review = apps.get_model("reviews", "Review")
+    reviews = Review.objects.filter(room=OuterRef("pk")).order_by().values("room")
+    Room.objects.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum("rating")).values("total")),
+            Value(0),
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count("pk")).values("total")),
+            Value(0),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0005_alter_room_amenities_alter_room_category_and_more'),
+        ('reviews', '0002_alter_review_experience_alter_review_room_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
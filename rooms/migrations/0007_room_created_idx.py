@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0006_room_rating_sum_room_rating_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['created_at', 'id'], name='room_created_idx'),
+        ),
+    ]
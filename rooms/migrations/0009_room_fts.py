@@ -0,0 +1,68 @@
+import re
+from django.db import migrations
+
+# rooms.fts 의 이 시점 사본, 나중에 fts.py 가 바뀌어도 이 migration 은 그대로
+FTS_TABLE = 'rooms_room_fts'
+
+FTS_COLUMNS = ('name', 'description', 'address', 'city')
+
+WORD_RE = re.compile(r'\w+')
+
+CJK_RE = re.compile(r'[ᄀ-ᇿ㄰-㆏぀-ヿ一-鿿가-힯]+')
+
+
+def word_tokens(word):
+    tokens = []
+    position = 0
+    for run in CJK_RE.finditer(word):
+        if run.start() > position:
+            tokens.append(word[position:run.start()].lower())
+        chars = run.group()
+        if len(chars) == 1:
+            tokens.append(chars)
+        else:
+            tokens += [chars[i:i + 2] for i in range(len(chars) - 1)]
+        position = run.end()
+    if position < len(word):
+        tokens.append(word[position:].lower())
+    return tokens
+
+
+def to_index_text(text):
+    return ' '.join(token for word in WORD_RE.findall(text or '') for token in word_tokens(word))
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Room = apps.get_model('rooms', 'Room')
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        f"USING fts5({', '.join(FTS_COLUMNS)}, tokenize='unicode61 remove_diacritics 2')"
+    )
+    rows = [
+        [room.pk] + [to_index_text(getattr(room, column)) for column in FTS_COLUMNS]
+        for room in Room.objects.only(*FTS_COLUMNS).iterator()
+    ]
+    if rows:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) VALUES (%s, %s, %s, %s, %s)",
+                rows,
+            )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0008_room_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:26
+
+from datetime import datetime
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_popularity(apps, schema_editor):
+    Room = apps.get_model("rooms", "Room")
+    Booking = apps.get_model("bookings", "Booking")
+    Wishlist = apps.get_model("wishlists", "Wishlist")
+    saves = (
+        Wishlist.rooms.through.objects.filter(room=OuterRef("pk"))
+        .order_by()
+        .values("room")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    bookings = (
+        Booking.objects.filter(room=OuterRef("pk"))
+        .order_by()
+        .values("room")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Room.objects.update(
+        save_count=Coalesce(Subquery(saves), Value(0)),
+        booking_count=Coalesce(Subquery(bookings), Value(0)),
+    )
+    # rooms.popularity.growth() with the default 7 day half life
+    growth = 2 ** ((datetime.now() - datetime(2023, 1, 1)).total_seconds() / (7 * 86400))
+    Room.objects.update(
+        trending_score=(F("save_count") * 3 + F("booking_count") * 5) * growth
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0010_room_latitude_longitude_geohash'),
+        ('bookings', '0006_roomnight_room_night_unique'),
+        ('wishlists', '0003_alter_wishlist_experiences_alter_wishlist_rooms_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='booking_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='save_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['city', '-trending_score'], name='room_city_trending_idx'),
+        ),
+        migrations.RunPython(backfill_popularity, migrations.RunPython.noop),
+    ]
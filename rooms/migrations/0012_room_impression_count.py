@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0011_room_popularity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='impression_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
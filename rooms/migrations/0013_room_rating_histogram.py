@@ -0,0 +1,59 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_histogram(apps, schema_editor):
+    Room = apps.get_model('rooms', 'Room')
+    Review = apps.get_model('reviews', 'Review')
+    updates = {}
+    for star in range(1, 6):
+        reviews = (
+            Review.objects.filter(room=OuterRef('pk'), rating=star)
+            .order_by()
+            .values('room')
+        )
+        updates[f'rating_{star}'] = Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            Value(0),
+        )
+    Room.objects.update(**updates)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0012_room_impression_count'),
+        ('reviews', '0003_review_room_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_histogram, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,29 @@
 from django.db import models
-from common.models import CommonModel
+from common.models import CommonModel, GeoModel, RatingModel, RatingQuerySet
 
 
-class Room(CommonModel):
+class RoomQuerySet(RatingQuerySet):
+
+    review_field = "room"
+
+    def for_list(self, *fields):
+        # RoomListSerializer 가 쓰는 컬럼만 (+ fields) + photos 는 한번에 prefetch
+        # rating 은 rating_sum / rating_count 컬럼, is_owner 는 owner_id 로 계산
+        return self.only(
+            *fields,
+            "pk",
+            "created_at",
+            "name",
+            "country",
+            "city",
+            "price",
+            "owner_id",
+            "rating_sum",
+            "rating_count",
+        ).prefetch_related("photos")
+
+
+class Room(CommonModel, GeoModel, RatingModel):
 
     """Room Model Definition"""
 
@@ -58,6 +79,32 @@ class Room(CommonModel):
         on_delete=models.SET_NULL,
         related_name="rooms",
     )
+    save_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    booking_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    view_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    impression_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    trending_score = models.FloatField(
+        default=0,
+        editable=False,
+    )
+    """
+    popularity counters, buffered in rooms/popularity.py and flushed in batches.
+    trending_score only makes sense relative to other rooms (see popularity.py)
+    """
+
+    objects = RoomQuerySet.as_manager()
 
     def __str__(room) -> str:
         return room.name
@@ -65,16 +112,31 @@ class Room(CommonModel):
     def total_amenities(room):
         return room.amenities.count()
 
-    def rating(room):
-        count = room.reviews.count()
-        if count == 0:
-            return 0
-        else:
-            total_rating = 0
-            for review in room.reviews.all().values("rating"):
-                # value("변수명(in models)")으로 전체가아닌 원하는 것만 빼옴 => 최적화
-                total_rating += review["rating"]
-            return round(total_rating / count, 2)
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"],
+                name="room_created_idx",
+            ),
+            # search: 위치(+가격), 종류(+가격), 가격 범위만
+            models.Index(
+                fields=["country", "city", "price"],
+                name="room_location_price_idx",
+            ),
+            models.Index(
+                fields=["kind", "price"],
+                name="room_kind_price_idx",
+            ),
+            models.Index(
+                fields=["price"],
+                name="room_price_idx",
+            ),
+            # trending in <city>
+            models.Index(
+                fields=["city", "-trending_score"],
+                name="room_city_trending_idx",
+            ),
+        ]
 
 
 class Amenity(CommonModel):
@@ -0,0 +1,110 @@
+"""
+room popularity: save_count, booking_count, view_count + decayed trending_score
+
+counter 들은 common.counters 로 모아서 한번에 씀 (언제 쓰는지는 counters.py 참고).
+trending 은 시간이 지나면 줄어드는 점수인데, 매번 모든 row 를 줄이는 대신
+새 event 의 무게를 growth(now) = 2 ** ((now - EPOCH) / half life) 배로 키워서 더함.
+모든 row 가 같은 비율로 작아지는 것과 순서가 같아서 index 로 그대로 정렬할 수 있음.
+지금 기준 점수 = trending_score / growth(now).
+반감기 7일이면 EPOCH 부터 ~19년 뒤에 float 범위를 넘으니 그 전에 EPOCH 를 옮기고
+trending_score 를 같은 비율로 줄일 것.
+"""
+from datetime import datetime
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from common.counters import BufferedCounter
+from .models import Room
+
+EPOCH = datetime(2023, 1, 1)
+
+# trending weight per event, search impressions only count
+WEIGHTS = {
+    "impression_count": 0,
+    "view_count": 1,
+    "save_count": 3,
+    "booking_count": 5,
+}
+
+
+def growth(now=None):
+    now = now or timezone.now()
+    half_life = settings.TRENDING_HALF_LIFE.total_seconds()
+    return 2 ** ((now - EPOCH).total_seconds() / half_life)
+
+
+def trending(room, now=None):
+    return round(room.trending_score / growth(now), 2)
+
+
+class PopularityCounter(BufferedCounter):
+    def get_updates(self, deltas):
+        updates = super().get_updates(deltas)
+        # 찜 취소, 예약 취소는 count 만 줄이고 trending 은 그대로 둠
+        weight = sum(WEIGHTS[field] * delta for field, delta in deltas if delta > 0)
+        if weight:
+            updates["trending_score"] = F("trending_score") + weight * growth()
+        return updates
+
+
+counter = PopularityCounter(
+    "room_popularity",
+    Room,
+    tuple(WEIGHTS),
+    flush_threshold=settings.POPULARITY_FLUSH_THRESHOLD,
+    flush_seconds=settings.POPULARITY_FLUSH_SECONDS,
+)
+
+
+def shown(room_pks):
+    """rooms listed in search results"""
+    for room_pk in room_pks:
+        counter.add(room_pk, impression_count=1)
+
+
+def viewed(room_pk):
+    counter.add(room_pk, view_count=1)
+
+
+def saved(room_pk, delta=1):
+    # wishlist / booking 이 rollback 되면 세지 않게 commit 된 뒤에 더함
+    transaction.on_commit(lambda: counter.add(room_pk, save_count=delta))
+
+
+def booked(room_pk, delta=1):
+    transaction.on_commit(lambda: counter.add(room_pk, booking_count=delta))
+
+
+def rebuild(rooms):
+    """
+    save_count / booking_count from wishlists and bookings, trending restarts from them.
+    view_count 는 원본 기록이 없어서 그대로 둠
+    """
+    from bookings.models import Booking
+    from wishlists.models import Wishlist
+
+    saves = Wishlist.rooms.through.objects.filter(room=OuterRef("pk"))
+    bookings = Booking.objects.filter(room=OuterRef("pk"))
+    rooms.update(
+        **{
+            field: Coalesce(
+                Subquery(
+                    rows.order_by()
+                    .values("room")
+                    .annotate(total=Count("pk"))
+                    .values("total")
+                ),
+                Value(0),
+            )
+            for field, rows in (("save_count", saves), ("booking_count", bookings))
+        }
+    )
+    return rooms.update(
+        trending_score=(
+            F("save_count") * WEIGHTS["save_count"]
+            + F("booking_count") * WEIGHTS["booking_count"]
+        )
+        * growth()
+    )
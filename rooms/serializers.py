@@ -1,11 +1,12 @@
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 from .models import Amenity, Room
+from . import fts, popularity
 from reviews.serializers import ReviewSerializer
 from users.serializers import TinyUserSerializer
 from categories.serializers import CategorySerializer
 from medias.serializers import PhotoSerializer
-from wishlists.models import Wishlist
+from wishlists.likes import liked_room_pks
 
 
 class AmenitySerializer(serializers.ModelSerializer):
@@ -35,21 +36,18 @@ class RoomDetailSerializer(serializers.ModelSerializer):
         return room.rating()
 
     def get_is_owner(self, room):
-        request = self.context["request"]
-        return room.owner == request.user
+        request = self.context.get("request")
+        return bool(request) and room.owner_id == request.user.pk
 
     def get_is_liked(self, room):
-        request = self.context["request"]
-        return Wishlist.objects.filter(
-            user=request.user,
-            rooms__pk=room.pk,
-        ).exists()
+        return room.pk in liked_room_pks(self.context.get("request"))
 
 
 class RoomListSerializer(serializers.ModelSerializer):
 
     rating = serializers.SerializerMethodField()
     is_owner = serializers.SerializerMethodField()
+    is_liked = serializers.SerializerMethodField()
     photos = PhotoSerializer(many=True, read_only=True)
 
     class Meta:
@@ -62,6 +60,7 @@ class RoomListSerializer(serializers.ModelSerializer):
             "price",
             "rating",
             "is_owner",
+            "is_liked",
             "photos",
         )
 
@@ -69,5 +68,104 @@ class RoomListSerializer(serializers.ModelSerializer):
         return room.rating()
 
     def get_is_owner(self, room):
-        request = self.context["request"]
-        return room.owner == request.user
+        request = self.context.get("request")
+        return bool(request) and room.owner_id == request.user.pk
+
+    def get_is_liked(self, room):
+        return room.pk in liked_room_pks(self.context.get("request"))
+
+
+class RoomMapSerializer(RoomListSerializer):
+
+    distance = serializers.FloatField(read_only=True)  # km, set by common.geo
+
+    class Meta(RoomListSerializer.Meta):
+        fields = RoomListSerializer.Meta.fields + (
+            "latitude",
+            "longitude",
+            "distance",
+        )
+
+
+class RoomTrendingSerializer(RoomListSerializer):
+
+    trending = serializers.SerializerMethodField()
+
+    class Meta(RoomListSerializer.Meta):
+        fields = RoomListSerializer.Meta.fields + (
+            "save_count",
+            "booking_count",
+            "view_count",
+            "trending",
+        )
+
+    def get_trending(self, room):
+        return popularity.trending(room)
+
+
+class RoomTextSearchSerializer(RoomListSerializer):
+
+    score = serializers.SerializerMethodField()
+    snippet = serializers.SerializerMethodField()
+
+    class Meta(RoomListSerializer.Meta):
+        fields = RoomListSerializer.Meta.fields + (
+            "score",
+            "snippet",
+        )
+
+    def get_score(self, room):
+        # bm25 는 작을수록 잘 맞는 값이라 부호를 뒤집어서 클수록 좋게
+        return round(-room.search_score, 4)
+
+    def get_snippet(self, room):
+        query = self.context["query"]
+        for field in ("description", "name", "address", "city"):
+            snippet = fts.snippet(getattr(room, field), query)
+            if snippet:
+                return snippet
+        return room.description[:80]
+
+
+class RoomSearchSerializer(serializers.Serializer):
+
+    """query params of GET api/v1/rooms/search"""
+
+    min_price = serializers.IntegerField(required=False, min_value=0)
+    max_price = serializers.IntegerField(required=False, min_value=0)
+    city = serializers.CharField(required=False)
+    country = serializers.CharField(required=False)
+    kind = serializers.ChoiceField(
+        choices=Room.RoomKindChoices.choices,
+        required=False,
+    )
+    pet_friendly = serializers.BooleanField(allow_null=True, default=None)
+    min_rooms = serializers.IntegerField(required=False, min_value=0)
+    min_toilets = serializers.IntegerField(required=False, min_value=0)
+    amenities = serializers.CharField(required=False)  # "1,2,3"
+    check_in = serializers.DateField(required=False)
+    check_out = serializers.DateField(required=False)
+
+    def validate_amenities(self, value):
+        try:
+            return sorted({int(pk) for pk in value.split(",") if pk.strip()})
+        except ValueError:
+            raise serializers.ValidationError("amenities should be comma separated ids")
+
+    def validate(self, data):
+        if data.get("pet_friendly") is None:
+            data.pop("pet_friendly", None)
+        if "min_price" in data and "max_price" in data:
+            if data["min_price"] > data["max_price"]:
+                raise serializers.ValidationError(
+                    "min_price should be smaller than max_price"
+                )
+        if ("check_in" in data) != ("check_out" in data):
+            raise serializers.ValidationError(
+                "check_in and check_out should be sent together"
+            )
+        if "check_in" in data and data["check_out"] <= data["check_in"]:
+            raise serializers.ValidationError(
+                "Check in Should be smaller than check out"
+            )
+        return data
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from . import fts
+from .models import Room
+
+
+@receiver(post_save, sender=Room)
+def index_room(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fts.index_rooms([instance])
+
+
+@receiver(post_delete, sender=Room)
+def unindex_room(sender, instance, **kwargs):
+    fts.unindex_room(instance.pk)
@@ -1,3 +1,521 @@
-from django.test import TestCase
+from datetime import date
+from django.core.cache import cache as django_cache
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from bookings.models import Booking
+from categories.models import Category
+from common import refdata
+from users.models import User
+from medias.models import Photo
+from wishlists.models import Wishlist
+from .models import Amenity, Room
+from . import popularity
 
-# Create your tests here.
+ROOMS = [("quiet", "서울"), ("busy", "서울"), ("busan", "부산")]
+
+
+class TestRoomList(APITestCase):
+
+    URL = "/api/v1/rooms/"
+
+    # rooms + photos prefetch, no matter how many rooms exist
+    LIST_QUERIES = 2
+
+    # + liked room pks of the logged in user
+    USER_LIST_QUERIES = 3
+
+    def setUp(self):
+        self.owner = User.objects.create(username="owner")
+        self.other = User.objects.create(username="other")
+
+    def create_rooms(self, count):
+        for i in range(count):
+            room = Room.objects.create(
+                name=f"Room {i}",
+                price=100,
+                rooms=1,
+                toilets=1,
+                description="desc",
+                address="address",
+                kind=Room.RoomKindChoices.ENTIRE_PLACE,
+                owner=self.owner,
+            )
+            Photo.objects.create(
+                file="https://example.com/photo.jpg",
+                description="photo",
+                room=room,
+            )
+
+    def test_query_count_is_constant(self):
+        self.create_rooms(2)
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get(self.URL)
+        self.assertEqual(len(response.json()["results"]), 2)
+
+        self.create_rooms(10)
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get(self.URL, {"page_size": 20})
+        self.assertEqual(len(response.json()["results"]), 12)
+
+    def test_is_owner(self):
+        self.create_rooms(1)
+        self.client.force_authenticate(self.owner)
+        with self.assertNumQueries(self.USER_LIST_QUERIES):
+            data = self.client.get(self.URL).json()["results"]
+        self.assertTrue(data[0]["is_owner"])
+        self.assertEqual(len(data[0]["photos"]), 1)
+
+        self.client.force_authenticate(self.other)
+        data = self.client.get(self.URL).json()["results"]
+        self.assertFalse(data[0]["is_owner"])
+
+    def test_is_liked(self):
+        self.create_rooms(3)
+        liked = Room.objects.order_by("pk").first()
+        Wishlist.objects.create(name="trip", user=self.other).rooms.add(liked)
+        self.assertEqual(
+            [room["is_liked"] for room in self.client.get(self.URL).json()["results"]],
+            [False, False, False],
+        )
+
+        self.client.force_authenticate(self.other)
+        with self.assertNumQueries(self.USER_LIST_QUERIES):
+            data = self.client.get(self.URL).json()["results"]
+        self.assertEqual(
+            {room["pk"] for room in data if room["is_liked"]},
+            {liked.pk},
+        )
+        detail = self.client.get(f"{self.URL}{liked.pk}").json()
+        self.assertTrue(detail["is_liked"])
+
+    def test_cursor_pagination(self):
+        self.create_rooms(5)
+        newest_first = list(
+            Room.objects.order_by("-created_at", "-pk").values_list("pk", flat=True)
+        )
+
+        seen = []
+        params = {"page_size": 2}
+        while True:
+            data = self.client.get(self.URL, params).json()
+            seen += [room["pk"] for room in data["results"]]
+            if not data["next"]:
+                break
+            params["cursor"] = data["next"]
+        self.assertEqual(seen, newest_first)
+
+        data = self.client.get(self.URL, {"page_size": 2, "cursor": data["previous"]})
+        self.assertEqual(
+            [room["pk"] for room in data.json()["results"]],
+            newest_first[2:4],
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.URL, {"cursor": "nope"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestRoomSearch(APITestCase):
+
+    URL = "/api/v1/rooms/search"
+
+    def setUp(self):
+        owner = User.objects.create(username="owner")
+        self.wifi = Amenity.objects.create(name="wifi")
+        self.parking = Amenity.objects.create(name="parking")
+        rooms = [
+            ("서울", 50000, Room.RoomKindChoices.ENTIRE_PLACE, [self.wifi, self.parking]),
+            ("서울", 120000, Room.RoomKindChoices.PRIVATE_ROOM, [self.wifi]),
+            ("부산", 80000, Room.RoomKindChoices.ENTIRE_PLACE, [self.wifi, self.parking]),
+        ]
+        for city, price, kind, amenities in rooms:
+            room = Room.objects.create(
+                name=city,
+                city=city,
+                price=price,
+                rooms=1,
+                toilets=1,
+                description="desc",
+                address="address",
+                kind=kind,
+                owner=owner,
+            )
+            room.amenities.set(amenities)
+
+    def test_filters(self):
+        data = self.client.get(self.URL, {"city": "서울", "max_price": 100000}).json()
+        self.assertEqual([room["price"] for room in data["results"]], [50000])
+
+        amenities = f"{self.wifi.pk},{self.parking.pk}"
+        data = self.client.get(self.URL, {"amenities": amenities}).json()
+        self.assertEqual(len(data["results"]), 2)
+
+    def test_facets(self):
+        data = self.client.get(self.URL, {"city": "서울"}).json()
+        facets = data["facets"]
+        # city facet ignores the city filter itself
+        self.assertEqual(
+            facets["city"],
+            [{"city": "서울", "count": 2}, {"city": "부산", "count": 1}],
+        )
+        self.assertEqual(
+            {kind["kind"]: kind["count"] for kind in facets["kind"]},
+            {"entire_place": 1, "private_room": 1},
+        )
+        self.assertEqual(
+            {amenity["name"]: amenity["count"] for amenity in facets["amenities"]},
+            {"wifi": 2, "parking": 1},
+        )
+        self.assertEqual(
+            [price["min_price"] for price in facets["price"]],
+            [50000, 100000],
+        )
+
+    def test_invalid_params(self):
+        response = self.client.get(self.URL, {"min_price": 10, "max_price": 1})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestRoomTextSearch(APITestCase):
+
+    URL = "/api/v1/rooms/search/text"
+
+    def create_room(self, name, description):
+        return Room.objects.create(
+            name=name,
+            price=100,
+            rooms=1,
+            toilets=1,
+            description=description,
+            address="서울특별시 마포구",
+            kind=Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.owner,
+        )
+
+    def setUp(self):
+        self.owner = User.objects.create(username="owner")
+        self.station = self.create_room("서울역 앞 숙소", "역까지 걸어서 오분")
+        self.beach = self.create_room("해운대 오션뷰", "바다가 보이는 넓은 거실")
+
+    def search(self, query):
+        return self.client.get(self.URL, {"q": query}).json()["results"]
+
+    def test_hangul_substring(self):
+        # name match outranks the address match
+        results = self.search("서울")
+        self.assertEqual(
+            [room["pk"] for room in results],
+            [self.station.pk, self.beach.pk],
+        )
+        self.assertIn("<b>서울</b>", results[0]["snippet"])
+        self.assertEqual([room["pk"] for room in self.search("바다")], [self.beach.pk])
+
+    def test_index_follows_save_and_delete(self):
+        self.beach.name = "광안리 바다 숙소"
+        self.beach.save()
+        self.assertEqual([room["pk"] for room in self.search("광안")], [self.beach.pk])
+        self.assertEqual(self.search("해운대"), [])
+
+        self.beach.delete()
+        self.assertEqual(self.search("바다"), [])
+
+
+class TestRoomsNearby(APITestCase):
+
+    URL = "/api/v1/rooms/nearby"
+
+    def setUp(self):
+        owner = User.objects.create(username="owner")
+        places = {
+            "시청": (37.5663, 126.9779),
+            "서울역": (37.5547, 126.9707),
+            "강남역": (37.4979, 127.0276),
+            "해운대": (35.1587, 129.1604),
+        }
+        self.rooms = {}
+        for name, (latitude, longitude) in places.items():
+            self.rooms[name] = Room.objects.create(
+                name=name,
+                price=100,
+                rooms=1,
+                toilets=1,
+                description="desc",
+                address="address",
+                kind=Room.RoomKindChoices.ENTIRE_PLACE,
+                owner=owner,
+                latitude=latitude,
+                longitude=longitude,
+            )
+
+    def names(self, params):
+        return [room["name"] for room in self.client.get(self.URL, params).json()]
+
+    def test_radius_sorted_by_distance(self):
+        self.assertEqual(
+            self.names({"lat": 37.5665, "lng": 126.9780, "radius": 2}),
+            ["시청", "서울역"],
+        )
+        self.assertEqual(
+            self.names({"lat": 37.5665, "lng": 126.9780, "radius": 20}),
+            ["시청", "서울역", "강남역"],
+        )
+
+    def test_page_cut_in_sql(self):
+        params = {"lat": 37.5665, "lng": 126.9780, "radius": 20, "page_size": 2}
+        # rooms (거리순 LIMIT) + 그 2 개의 photos
+        with self.assertNumQueries(2):
+            self.assertEqual(self.names(params), ["시청", "서울역"])
+
+    def test_bbox(self):
+        params = {"min_lat": 35, "min_lng": 129, "max_lat": 36, "max_lng": 130}
+        self.assertEqual(self.names(params), ["해운대"])
+
+        params = {"min_lat": 33, "min_lng": 124, "max_lat": 39, "max_lng": 132}
+        self.assertEqual(self.client.get(self.URL, params).status_code, 400)
+
+    def test_geohash_follows_coordinates(self):
+        room = self.rooms["해운대"]
+        self.assertTrue(room.geohash.startswith("wy"))
+        room.latitude = None
+        room.save()
+        self.assertEqual(room.geohash, "")
+
+
+class TestRoomAvailability(APITestCase):
+
+    URL = "/api/v1/rooms/search"
+
+    def setUp(self):
+        self.owner = User.objects.create(username="owner")
+        self.free = self.create_room("free")
+        self.booked = self.create_room("booked")
+        Booking.objects.create(
+            kind=Booking.BookingKindChoices.ROOM,
+            user=self.owner,
+            room=self.booked,
+            check_in=date(2030, 1, 10),
+            check_out=date(2030, 1, 12),
+            guests=1,
+        )
+
+    def create_room(self, name):
+        return Room.objects.create(
+            name=name,
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.owner,
+        )
+
+    def available(self, check_in, check_out):
+        data = self.client.get(
+            self.URL,
+            {"check_in": check_in, "check_out": check_out},
+        ).json()
+        return {room["name"] for room in data["results"]}
+
+    def test_overlap(self):
+        self.assertEqual(self.available("2030-01-11", "2030-01-15"), {"free"})
+        self.assertEqual(self.available("2030-01-08", "2030-01-11"), {"free"})
+
+    def test_check_out_day_is_free(self):
+        self.assertEqual(
+            self.available("2030-01-12", "2030-01-14"),
+            {"free", "booked"},
+        )
+        self.assertEqual(
+            self.available("2030-01-08", "2030-01-10"),
+            {"free", "booked"},
+        )
+
+    def test_nights_follow_booking(self):
+        booking = self.booked.bookings.get()
+        booking.check_in = date(2030, 2, 1)
+        booking.check_out = date(2030, 2, 2)
+        booking.save()
+        self.assertEqual(
+            self.available("2030-01-10", "2030-01-12"),
+            {"free", "booked"},
+        )
+        booking.delete()
+        self.assertEqual(self.available("2030-02-01", "2030-02-02"), {"free", "booked"})
+
+
+class TestRoomPopularity(APITestCase):
+
+    URL = "/api/v1/rooms/trending"
+
+    def setUp(self):
+        popularity.counter.clear()
+        self.owner = User.objects.create(username="owner")
+        self.rooms = [self.create_room(name, city) for name, city in ROOMS]
+
+    def create_room(self, name, city):
+        return Room.objects.create(
+            name=name,
+            city=city,
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.owner,
+        )
+
+    def test_buffered_until_flush(self):
+        quiet, busy, busan = self.rooms
+        for i in range(3):
+            self.client.get(f"/api/v1/rooms/{busy.pk}")
+        self.client.get(f"/api/v1/rooms/{quiet.pk}")
+        busy.refresh_from_db()
+        self.assertEqual(busy.view_count, 0)
+
+        # same increments are written together
+        with self.assertNumQueries(4):  # savepoint + 2 groups + release
+            popularity.counter.flush()
+        busy.refresh_from_db()
+        self.assertEqual(busy.view_count, 3)
+        self.assertEqual(popularity.counter.pending(), 0)
+
+    def test_trending_in_city(self):
+        quiet, busy, busan = self.rooms
+        popularity.viewed(quiet.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            popularity.saved(busy.pk)
+            popularity.booked(busan.pk)
+        popularity.counter.flush()
+
+        data = self.client.get(self.URL, {"city": "서울"}).json()
+        self.assertEqual([room["name"] for room in data], ["busy", "quiet"])
+        self.assertEqual(data[0]["save_count"], 1)
+        self.assertEqual(data[0]["trending"], popularity.WEIGHTS["save_count"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            popularity.saved(busy.pk, -1)
+            popularity.saved(busy.pk, -1)
+        popularity.counter.flush()
+        busy.refresh_from_db()
+        self.assertEqual(busy.save_count, 0)
+
+    def test_rolled_back_writes_are_not_counted(self):
+        quiet, busy, busan = self.rooms
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    popularity.saved(busy.pk)
+                    popularity.booked(busan.pk)
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+        self.assertEqual(popularity.counter.pending(), 0)
+
+    def test_rebuild(self):
+        quiet, busy, busan = self.rooms
+        Booking.objects.create(
+            kind=Booking.BookingKindChoices.ROOM,
+            user=self.owner,
+            room=busan,
+            check_in=date(2030, 1, 10),
+            check_out=date(2030, 1, 12),
+            guests=1,
+        )
+        Wishlist.objects.create(name="trip", user=self.owner).rooms.add(busy)
+        popularity.counter.clear()
+        popularity.rebuild(Room.objects.all())
+        busan.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual((busan.booking_count, busy.save_count), (1, 1))
+        self.assertGreater(busan.trending_score, busy.trending_score)
+
+
+class TestRoomAmenities(APITestCase):
+
+    URL = "/api/v1/rooms/"
+
+    def setUp(self):
+        django_cache.clear()
+        refdata.amenities.clear()
+        self.owner = User.objects.create(username="owner")
+        self.category = Category.objects.create(
+            name="house",
+            kind=Category.CategoryKindChoices.ROOMS,
+        )
+        self.amenities = [
+            Amenity.objects.create(name=f"amenity {i}") for i in range(40)
+        ]
+        self.client.force_authenticate(self.owner)
+
+    def post_room(self, amenities):
+        return self.client.post(
+            self.URL,
+            {
+                "name": "room",
+                "price": 100,
+                "rooms": 1,
+                "toilets": 1,
+                "description": "desc",
+                "address": "address",
+                "kind": Room.RoomKindChoices.ENTIRE_PLACE,
+                "category": self.category.pk,
+                "amenities": amenities,
+            },
+            format="json",
+        )
+
+    def create_room(self, amenities):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_room([amenity.pk for amenity in amenities])
+        self.assertEqual(response.status_code, 200)
+        return Room.objects.get(pk=response.json()["id"]), len(queries)
+
+    def amenity_pks(self, room):
+        return set(room.amenities.values_list("pk", flat=True))
+
+    def test_query_count_does_not_grow(self):
+        self.create_room([])  # refdata 를 미리 읽어둠
+        room, few = self.create_room(self.amenities[:2])
+        self.assertEqual(len(self.amenity_pks(room)), 2)
+        room, many = self.create_room(self.amenities)
+        self.assertEqual(len(self.amenity_pks(room)), 40)
+        self.assertEqual(few, many)
+
+    def test_missing_ids_reported_at_once(self):
+        response = self.post_room([self.amenities[0].pk, 998, 999])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("998, 999", response.json()["amenities"][0])
+        self.assertFalse(Room.objects.exists())
+
+    def test_ids_are_normalised(self):
+        first, second = self.amenities[:2]
+        room, _ = self.create_room([])
+        response = self.client.put(
+            f"{self.URL}{room.pk}",
+            {"amenities": [str(first.pk), second.pk, second.pk]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.amenity_pks(room), {first.pk, second.pk})
+        response = self.post_room([True, "x", 999])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("True, x, 999", response.json()["amenities"][0])
+
+    def test_put_applies_diff(self):
+        room, _ = self.create_room(self.amenities[:3])
+        keep = self.amenities[1:3]
+        new = self.amenities[5]
+        response = self.client.put(
+            f"{self.URL}{room.pk}",
+            {"amenities": [amenity.pk for amenity in keep + [new]]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["amenities"]), 3)
+        self.assertEqual(
+            self.amenity_pks(room),
+            {amenity.pk for amenity in keep + [new]},
+        )
@@ -3,11 +3,16 @@ from . import views
 
 urlpatterns = [
     path("", views.Rooms.as_view()),
+    path("search", views.RoomSearch.as_view()),
+    path("search/text", views.RoomTextSearch.as_view()),
+    path("nearby", views.RoomsNearby.as_view()),
+    path("trending", views.RoomsTrending.as_view()),
     path("<int:pk>", views.RoomDetail.as_view()),
     path("<int:pk>/amenities", views.RoomAmenities.as_view()),
     path("<int:pk>/photos", views.RoomPhotos.as_view()),
     path("<int:pk>/bookings", views.RoomBookings.as_view()),
     path("<int:pk>/bookings/<int:bk_pk>", views.RoomBookingsRevise.as_view()),
+    path("<int:pk>/calendar", views.RoomCalendar.as_view()),
     # room id / amenities - list of amenitites pagiantions
     path("<int:pk>/reviews", views.RoomReviews.as_view()),
     path("amenities/", views.Amenities.as_view()),
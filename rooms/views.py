@@ -1,5 +1,6 @@
-from django.db import transaction
-from django.conf import settings
+from datetime import date
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q, prefetch_related_objects
 from django.utils import timezone
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -12,13 +13,27 @@ from rest_framework.exceptions import (
 from rest_framework.status import HTTP_204_NO_CONTENT, HTTP_201_CREATED
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django.http import HttpResponse
+from common import assignment, refdata
+from common.facets import FacetedSearchMixin
+from common.pagination import KeysetPagination
+from common.serializers import NearbySerializer
 from .models import Room
+from . import fts, popularity
 from categories.models import Category
 from .models import Amenity
-from .serializers import AmenitySerializer, RoomListSerializer, RoomDetailSerializer
+from .serializers import (
+    AmenitySerializer,
+    RoomListSerializer,
+    RoomDetailSerializer,
+    RoomMapSerializer,
+    RoomSearchSerializer,
+    RoomTextSearchSerializer,
+    RoomTrendingSerializer,
+)
 from reviews.serializers import ReviewSerializer
 from medias.serializers import PhotoSerializer
-from bookings.models import Booking
+from bookings import calendar
+from bookings.models import Booking, RoomNight
 from bookings.serializers import (
     PublicBookingSerializer,
     CreateRoomBookingSerializer,
@@ -29,9 +44,7 @@ from bookings.serializers import (
 
 class Amenities(APIView):
     def get(self, request):
-        all_amenities = Amenity.objects.all()
-        serializer = AmenitySerializer(all_amenities, many=True)
-        return Response(serializer.data)
+        return refdata.amenities.list_response(request, AmenitySerializer)
 
     def post(self, request):
         serializer = AmenitySerializer(data=request.data)
@@ -78,43 +91,193 @@ class Rooms(APIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get(self, request):
-        all_rooms = Room.objects.all()
+        paginator = KeysetPagination()
+        rooms = paginator.paginate_queryset(Room.objects.for_list(), request)
         serializer = RoomListSerializer(
-            all_rooms,
+            rooms,
             many=True,
             context={"request": request},
         )
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
-        serializer = RoomDetailSerializer(data=request.data)
+        serializer = RoomDetailSerializer(
+            data=request.data,
+            context={"request": request},
+        )
         if serializer.is_valid():
             category_pk = request.data.get("category")
             if not category_pk:
                 raise ParseError("Category is required.")
-            try:
-                category = Category.objects.get(pk=category_pk)
-                if category.kind == Category.CategoryKindChoices.EXPERIENCES:
-                    raise ParseError("The Category kind should be 'rooms'")
-            except Category.DoesNotExist:
+            category = refdata.categories.get(category_pk)
+            if category is None:
                 raise ParseError("Category Not Found")
-            try:
-                with transaction.atomic():
-                    room = serializer.save(
-                        owner=request.user,
-                        category=category,
-                    )
-                    amenities = request.data.get("amenities")
-                    for amenity_pk in amenities:
-                        amenity = Amenity.objects.get(pk=amenity_pk)
-                        room.amenities.add(amenity)
-                    return Response(serializer.data)
-            except Exception:
-                raise ParseError("Amenity not found")
+            if category.kind == Category.CategoryKindChoices.EXPERIENCES:
+                raise ParseError("The Category kind should be 'rooms'")
+            # 없는 amenity 가 있으면 room 을 만들기 전에 전부 알려줌
+            amenities = assignment.validate(
+                refdata.amenities,
+                request.data.get("amenities"),
+                "amenities",
+            )
+            with transaction.atomic():
+                room = serializer.save(
+                    owner=request.user,
+                    category=category,
+                )
+                assignment.assign(room, "amenities", amenities)
+            return Response(serializer.data)
         else:
             return Response(serializer.errors)
 
 
+class RoomSearch(FacetedSearchMixin, APIView):
+
+    """
+    GET api/v1/rooms/search?city=서울&min_price=...&amenities=1,2
+    GET api/v1/rooms/search?check_in=2023-01-01&check_out=2023-01-03 (free rooms only)
+    filtered rooms (cursor paginated) + facet counts on the first page (common/facets.py)
+    """
+
+    model = Room
+    filter_fields = ("city", "country", "kind", "pet_friendly")
+    price_bucket_size = 50000
+
+    def get_filters(self, params):
+        filters = super().get_filters(params)
+        self.add_range(filters, "rooms", low=params.get("min_rooms"))
+        self.add_range(filters, "toilets", low=params.get("min_toilets"))
+        if params.get("amenities"):
+            filters["amenities"] = self.has_all("amenities", params["amenities"])
+        if "check_in" in params:
+            # 방마다 (room, night) index 를 한번 찔러보는 NOT EXISTS, 전체 예약 수와 무관
+            booked = RoomNight.objects.filter(
+                room=OuterRef("pk"),
+                night__gte=params["check_in"],
+                night__lt=params["check_out"],
+            )
+            filters["dates"] = ~Q(Exists(booked))
+        return filters
+
+    def get_facets(self, filters):
+        facets = super().get_facets(filters)
+        for field in ("rooms", "toilets"):
+            facets[field] = self.count_by(filters, field)
+        facets["amenities"] = self.count_related(filters, "amenities")
+        return facets
+
+    def get(self, request):
+        params = RoomSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = self.get_filters(params.validated_data)
+
+        def serialize(rooms):
+            popularity.shown(room.pk for room in rooms)
+            return RoomListSerializer(
+                rooms,
+                many=True,
+                context={"request": request},
+            ).data
+
+        data = self.paginate_with_facets(
+            request,
+            filters,
+            self.get_queryset(filters).for_list(),
+            serialize,
+        )
+        return Response(data)
+
+
+class RoomsNearby(APIView):
+
+    """
+    GET api/v1/rooms/nearby?lat=37.55&lng=126.97&radius=3
+    GET api/v1/rooms/nearby?min_lat=..&min_lng=..&max_lat=..&max_lng=..
+    sorted by distance (to the center of the bbox)
+    """
+
+    def get(self, request):
+        params = NearbySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        rooms = params.nearest(
+            Room.objects.for_list("latitude", "longitude").prefetch_related(None),
+            limit=KeysetPagination().get_page_size(request),
+        )
+        # 거리로 자른 다음 돌려줄 room 의 photos 만
+        prefetch_related_objects(rooms, "photos")
+        serializer = RoomMapSerializer(
+            rooms,
+            many=True,
+            context={"request": request},
+        )
+        return Response(serializer.data)
+
+
+class RoomTextSearch(APIView):
+
+    """GET api/v1/rooms/search/text?q=서울 바다&page=1 ranked by bm25"""
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ParseError("q is required")
+        try:
+            page = max(1, int(request.query_params.get("page", 1)))
+        except ValueError:
+            page = 1
+        page_size = KeysetPagination().get_page_size(request)
+        hits = fts.search(query, limit=page_size, offset=(page - 1) * page_size)
+        rooms = Room.objects.prefetch_related("photos").in_bulk([pk for pk, _ in hits])
+        results = []
+        for pk, score in hits:
+            if pk in rooms:
+                rooms[pk].search_score = score
+                results.append(rooms[pk])
+        popularity.shown(room.pk for room in results)
+        serializer = RoomTextSearchSerializer(
+            results,
+            many=True,
+            context={"request": request, "query": query},
+        )
+        return Response(
+            {
+                "page": page,
+                "next": page + 1 if len(hits) == page_size else None,
+                "results": serializer.data,
+            }
+        )
+
+
+class RoomsTrending(APIView):
+
+    """
+    GET api/v1/rooms/trending?city=서울&page_size=10
+    rooms of the city ordered by decayed popularity (rooms/popularity.py)
+    """
+
+    def get(self, request):
+        city = request.query_params.get("city")
+        if not city:
+            raise ParseError("city is required")
+        # room_city_trending_idx 로 city 범위만 읽고 끝남
+        rooms = (
+            Room.objects.for_list(
+                "save_count",
+                "booking_count",
+                "view_count",
+                "trending_score",
+            )
+            .filter(city=city, trending_score__gt=0)
+            .order_by("-trending_score")[: KeysetPagination().get_page_size(request)]
+        )
+        serializer = RoomTrendingSerializer(
+            rooms,
+            many=True,
+            context={"request": request},
+        )
+        return Response(serializer.data)
+
+
 class RoomDetail(APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -127,6 +290,7 @@ class RoomDetail(APIView):
 
     def get(self, request, pk):
         room = self.get_object(pk=pk)
+        popularity.viewed(room.pk)
         serializer = RoomDetailSerializer(
             room,
             context={"request": request},
@@ -146,26 +310,31 @@ class RoomDetail(APIView):
             if "category" in request.data:
                 category_pk = request.data.get("category")
 
-                try:
-                    category = Category.objects.get(pk=category_pk)
-                    if category.kind == Category.CategoryKindChoices.EXPERIENCES:
-                        raise ParseError("Category kind should be rooms")
-                    room.category = category
-                except Category.DoesNotExist:
+                category = refdata.categories.get(category_pk)
+                if category is None:
                     raise ParseError("Category model is not exist")
-
-            if "amenity" in request.data:
-                try:
-                    amenities = request.data.get("amenities")
-                    if amenities:
-                        room.amenities.clear()
-                        for amenity_pk in amenities:
-                            amenity = Amenity.objects.get(pk=amenity_pk)
-                            room.amenitys.add(amenity)
-                except Exception:
-                    raise ParseError()
-            updated_room = serializer.save()
-            return Response(RoomDetailSerializer(updated_room).data)
+                if category.kind == Category.CategoryKindChoices.EXPERIENCES:
+                    raise ParseError("Category kind should be rooms")
+                room.category = category
+
+            amenities = None
+            if "amenities" in request.data:
+                amenities = assignment.validate(
+                    refdata.amenities,
+                    request.data.get("amenities"),
+                    "amenities",
+                )
+            with transaction.atomic():
+                updated_room = serializer.save()
+                if amenities is not None:
+                    # 빠진 것만 추가, 없어진 것만 삭제
+                    assignment.assign(updated_room, "amenities", amenities)
+            return Response(
+                RoomDetailSerializer(
+                    updated_room,
+                    context={"request": request},
+                ).data
+            )
         else:
             return Response(serializer.errors)
 
@@ -188,20 +357,21 @@ class RoomReviews(APIView):  # pagination
             raise NotFound
 
     def get(self, request, pk):
-        try:
-            page = request.query_params.get("page", 1)
-            page = int(page)
-        except ValueError:
-            page = 1
-        page_size = settings.PAGE_SIZE
-        start = (page - 1) * page_size
-        end = start + page_size
         room = self.get_object(pk)
+        paginator = KeysetPagination()
+        reviews = paginator.paginate_queryset(
+            room.reviews.select_related("user"),
+            request,
+        )
         serialiezer = ReviewSerializer(
-            room.reviews.all()[start:end],
+            reviews,
             many=True,
         )
-        return Response(serialiezer.data)
+        data = paginator.get_paginated_data(serialiezer.data)
+        if not request.query_params.get(paginator.cursor_query_param):
+            # 별점 분포는 첫 페이지에만, room 컬럼이라 review 를 다시 세지 않음
+            data["summary"] = room.rating_summary()
+        return Response(data)
 
     def post(self, request, pk):
 
@@ -211,8 +381,10 @@ class RoomReviews(APIView):  # pagination
                 user=request.user,
                 room=self.get_object(pk),
             )
-        serializer = ReviewSerializer(review)  # py > json
-        return Response(serializer.data)
+            serializer = ReviewSerializer(review)  # py > json
+            return Response(serializer.data)
+        else:
+            return Response(serializer.errors)
 
 
 class RoomAmenities(APIView):
@@ -279,7 +451,7 @@ class RoomBookings(APIView):  # GET POST
 
     def get(self, request, pk):
         room = self.get_object(pk)
-        now = timezone.localtime(timezone.now()).date()
+        now = timezone.now().date()
         bookings = Booking.objects.filter(
             room=room,
             kind=Booking.BookingKindChoices.ROOM,
@@ -290,11 +462,21 @@ class RoomBookings(APIView):  # GET POST
 
     def post(self, request, pk):
         room = self.get_object(pk)
-        serializer = CreateRoomBookingSerializer(data=request.data)
+        serializer = CreateRoomBookingSerializer(
+            data=request.data,
+            context={"room": room},
+        )
         if serializer.is_valid():
-            booking = serializer.save(
-                room=room, user=request.user, kind=Booking.BookingKindChoices.ROOM
-            )
+            try:
+                with transaction.atomic():
+                    booking = serializer.save(
+                        room=room,
+                        user=request.user,
+                        kind=Booking.BookingKindChoices.ROOM,
+                    )
+            except IntegrityError:
+                # validate() 와 save() 사이에 다른 요청이 같은 밤을 가져감
+                raise ParseError("Those(or some) of those dates are already taken.")
             serializer = PublicBookingSerializer(booking)
             return Response(serializer.data)
         else:
@@ -303,11 +485,31 @@ class RoomBookings(APIView):  # GET POST
     def delete(self, request, pk):
 
         room = self.get_object(pk)
-        now = timezone.localtime(timezone.now()).date()
+        now = timezone.now().date()
         room.bookings.filter(check_out__gte=now).delete()
         return Response(status=HTTP_204_NO_CONTENT)
 
 
+class RoomCalendar(APIView):
+
+    """GET api/v1/rooms/<pk>/calendar?month=2023-01 (see bookings/calendar.py)"""
+
+    def get(self, request, pk):
+        if not Room.objects.filter(pk=pk).exists():
+            raise NotFound
+        month = request.query_params.get("month")
+        try:
+            if month:
+                year, month = (int(part) for part in month.split("-"))
+            else:
+                today = timezone.now().date()
+                year, month = today.year, today.month
+            date(year, month, 1)
+        except ValueError:
+            raise ParseError("month should be YYYY-MM")
+        return Response(calendar.month_calendar(pk, year, month))
+
+
 class RoomBookingsRevise(APIView):  # PUT DELETE
     def get_object(self, bk_pk):
         try:
@@ -321,11 +523,15 @@ class RoomBookingsRevise(APIView):  # PUT DELETE
             booking,
             data=request.data,
             partial=True,
+            context={"room": booking.room},
         )
         if serializer.is_valid():
             if request.user == booking.user:
-
-                updated_booking = serializer.save()
+                try:
+                    with transaction.atomic():
+                        updated_booking = serializer.save()
+                except IntegrityError:
+                    raise ParseError("Those(or some) of those dates are already taken.")
                 return Response(PublicBookingSerializer(updated_booking).data)
             else:
                 raise ParseError("You can't revise booking")
@@ -335,6 +541,6 @@ class RoomBookingsRevise(APIView):  # PUT DELETE
     def delete(self, request, pk):
 
         room = self.get_object(pk)
-        now = timezone.localtime(timezone.now()).date()
+        now = timezone.now().date()
         room.bookings.filter(check_out__gte=now).delete()
         return Response(status=HTTP_204_NO_CONTENT)
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from . import passwords
+
+UserModel = get_user_model()
+
+
+class LimitedModelBackend(ModelBackend):
+
+    """ModelBackend with the password check under the hash limit (users/passwords.py)"""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            user = None
+        if not passwords.check_password(user, password):
+            return None
+        if not self.user_can_authenticate(user):
+            return None
+        return user
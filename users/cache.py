@@ -0,0 +1,85 @@
+"""
+in-process User / token cache for the authentication classes (config/authentication.py).
+인증마다 User 를 DB 에서 읽지 않도록 pk / username 으로 캐시하고,
+User 가 저장/삭제되면 users/signals.py 가 지움.
+tokens 는 AuthToken digest > user pk, token 이 삭제(revoke)되면 지움.
+이 cache 는 worker 마다 따로라서 revoke 는 공용 cache (django.core.cache) 에
+digest 별 표시를 TOKEN_CACHE_TTL 동안 남기고, 다른 worker 는 cache hit 때 그걸 보고 DB 로 다시 확인함
+(locmem cache 는 worker 마다 따로, 여러 worker 면 CACHES 에 공용 cache 를 설정할 것)
+"""
+import copy
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+from django.db import transaction
+from common import metrics
+from common.cache import LRUCache
+from .models import AuthToken, User
+
+users = LRUCache(
+    maxsize=getattr(settings, "USER_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "USER_CACHE_TTL", 60),
+)
+
+tokens = LRUCache(
+    maxsize=getattr(settings, "TOKEN_CACHE_SIZE", 4096),
+    ttl=getattr(settings, "TOKEN_CACHE_TTL", 60),
+)
+
+metrics.register("user_cache", users.stats)
+metrics.register("token_cache", tokens.stats)
+
+
+def get_user(pk=None, username=None):
+    """raises User.DoesNotExist like User.objects.get"""
+    key = ("pk", pk) if pk is not None else ("username", username)
+    user = users.get(key)
+    if user is None:
+        user = User.objects.get(**{key[0]: key[1]})
+        remember(user)
+    # 요청마다 복사본을 줘서 한 요청이 바꾼 값이 다른 요청에 새지 않게 함
+    return copy.copy(user)
+
+
+def remember(user):
+    users.set(("pk", user.pk), user)
+    users.set(("username", user.username), user)
+
+
+def forget(user):
+    cached = users.pop(("pk", user.pk))
+    if cached is not None:
+        users.delete(("username", cached.username))  # username 이 바뀐 경우
+    users.delete(("username", user.username))
+
+
+def revoked_key(digest):
+    return f"revoked-token:{digest}"
+
+
+def get_token_user(key):
+    """raises AuthToken.DoesNotExist for unknown / revoked keys"""
+    digest = AuthToken.hash_key(key)
+    user_pk = tokens.get(digest)
+    if user_pk is not None and shared_cache.get(revoked_key(digest)):
+        # 다른 worker 에서 revoke 됨
+        tokens.delete(digest)
+        user_pk = None
+    if user_pk is None:
+        token = AuthToken.objects.select_related("user").get(digest=digest)
+        remember(token.user)
+        tokens.set(digest, token.user_id)
+        user_pk = token.user_id
+    try:
+        return get_user(pk=user_pk)
+    except User.DoesNotExist:
+        tokens.delete(digest)
+        raise AuthToken.DoesNotExist
+
+
+def revoke_token(digest):
+    tokens.delete(digest)
+    # 다른 worker 의 cache 는 길어야 ttl 뒤에 사라지므로 표시도 그만큼만 남김.
+    # commit 뒤에 남겨야 그 사이에 DB 에서 읽어 cache 한 worker 도 걸러짐
+    transaction.on_commit(
+        lambda: shared_cache.set(revoked_key(digest), True, tokens.ttl)
+    )
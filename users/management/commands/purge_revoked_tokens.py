@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from users import tokens
+
+
+class Command(BaseCommand):
+
+    help = "Delete RevokedToken rows whose token has expired (run daily)"
+
+    def handle(self, *args, **options):
+        deleted = tokens.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} revoked tokens deleted"))
@@ -0,0 +1,33 @@
+import hashlib
+import hmac
+from django.conf import settings
+from django.db import migrations
+
+
+def hash_existing_tokens(apps, schema_editor):
+    # rest_framework.authtoken 의 평문 key 를 AuthToken digest 로 옮기고 평문은 지움
+    Token = apps.get_model("authtoken", "Token")
+    AuthToken = apps.get_model("users", "AuthToken")
+    secret = getattr(settings, "TOKEN_HASH_KEY", settings.SECRET_KEY).encode()
+    AuthToken.objects.bulk_create(
+        [
+            AuthToken(
+                user_id=token.user_id,
+                digest=hmac.new(secret, token.key.encode(), hashlib.sha256).hexdigest(),
+            )
+            for token in Token.objects.all()
+        ]
+    )
+    Token.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authtoken", "0003_tokenproxy"),
+        ("users", "0005_authtoken"),
+    ]
+
+    operations = [
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+    ]
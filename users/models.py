@@ -1,5 +1,10 @@
+import hashlib
+import hmac
+import secrets
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from common.models import CommonModel
 
 
 class User(AbstractUser):
@@ -41,3 +46,57 @@ class User(AbstractUser):
         max_length=5,
         choices=CurrencyChoices.choices,
     )
+
+
+class AuthTokenQuerySet(models.QuerySet):
+    def issue(self, user):
+        """returns the plain key, only its keyed hash is stored"""
+        key = secrets.token_hex(20)
+        self.create(user=user, digest=AuthToken.hash_key(key))
+        return key
+
+
+class AuthToken(CommonModel):
+
+    """
+    API token for "Authorization: Token <key>" (config/authentication.py).
+    key 는 저장하지 않고 HMAC-SHA256(TOKEN_HASH_KEY, key) 만 저장함,
+    DB 가 새도 token 으로 로그인 할 수 없음
+    """
+
+    digest = models.CharField(
+        max_length=64,
+        unique=True,
+        editable=False,
+    )
+    user = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="auth_tokens",
+    )
+
+    objects = AuthTokenQuerySet.as_manager()
+
+    def __str__(self) -> str:
+        return f"Token for {self.user}"
+
+    @staticmethod
+    def hash_key(key):
+        secret = getattr(settings, "TOKEN_HASH_KEY", settings.SECRET_KEY)
+        return hmac.new(secret.encode(), key.encode(), hashlib.sha256).hexdigest()
+
+
+class RevokedToken(CommonModel):
+
+    """jti of a logged out / rotated JWT, loaded into memory by users/tokens.py"""
+
+    jti = models.CharField(
+        max_length=32,
+        unique=True,
+    )
+    expires_at = models.DateTimeField(
+        db_index=True,
+    )
+
+    def __str__(self) -> str:
+        return self.jti
@@ -0,0 +1,74 @@
+"""
+concurrency cap on password hashing.
+
+PBKDF2 한번이 수십 ms 라서 로그인이 몰리면 CPU 를 다 잡아먹음.
+PASSWORD_HASH_WORKERS 개만 동시에 hash 하고, 그 뒤로 PASSWORD_HASH_QUEUE 개까지만
+기다리게 하고 넘치면 바로 429 를 돌려줌 (다른 endpoint 가 쓸 CPU 를 남겨둠).
+hash 는 요청 thread 에서 그대로 돌고, 기다리는 동안도 그 thread 를 잡고 있음.
+DRF 3.14 의 APIView 는 async handler 를 지원하지 않아서 thread 를 놓아줄 방법은 없고,
+대신 queue 를 작게 잡아서 오래 붙잡히기 전에 429 로 끊음.
+로그인은 django.contrib.auth.authenticate() 를 그대로 쓰고 (AUTHENTICATION_BACKENDS,
+user_login_failed signal), users/backends.py 의 backend 가 hash 를 여기로 보냄
+"""
+import threading
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework.exceptions import Throttled
+from common import metrics
+
+
+class PasswordHashLimiter:
+    def __init__(self, workers, queue):
+        self.workers = workers
+        # 기다리는 것까지 포함한 자리, 없으면 429
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        # 실제로 hash 하는 자리
+        self._running = threading.BoundedSemaphore(workers)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _track(self, delta):
+        with self._lock:
+            self._in_flight += delta
+            metrics.gauge("password_hash.in_flight", self._in_flight)
+            metrics.gauge(
+                "password_hash.queue_depth", max(self._in_flight - self.workers, 0)
+            )
+
+    def run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            metrics.incr("password_hash.rejected")
+            raise Throttled(detail="Too many log in requests, try again soon.")
+        self._track(1)
+        try:
+            with metrics.timer("password_hash"):
+                with self._running:
+                    return function(*args)
+        finally:
+            self._track(-1)
+            self._slots.release()
+
+
+limiter = PasswordHashLimiter(
+    workers=getattr(settings, "PASSWORD_HASH_WORKERS", 2),
+    queue=getattr(settings, "PASSWORD_HASH_QUEUE", 16),
+)
+
+
+def check_password(user, password):
+    """user.check_password() under the hashing limit, user may be None"""
+    if user is None:
+        # 없는 username 도 hash 한번은 돌려서 응답 시간으로 구분 못하게 함
+        limiter.run(hashers.make_password, password)
+        return False
+    if not limiter.run(hashers.check_password, password, user.password):
+        return False
+    if hashers.identify_hasher(user.password).must_update(user.password):
+        set_password(user, password)
+        user.save(update_fields=["password"])
+    return True
+
+
+def set_password(user, password):
+    user.password = limiter.run(hashers.make_password, password)
+    user._password = password
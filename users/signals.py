@@ -0,0 +1,29 @@
+from django.contrib.auth.signals import user_login_failed
+from django.core.signals import request_finished
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from . import cache, tokens
+from .throttles import LogInUsernameThrottle
+from .models import AuthToken, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, **kwargs):
+    cache.forget(instance)
+
+
+@receiver(post_delete, sender=AuthToken)
+def revoke_token(sender, instance, **kwargs):
+    cache.revoke_token(instance.digest)
+
+
+@receiver(request_finished)
+def sync_revocations(sender, **kwargs):
+    # response 를 보낸 다음이라 요청 latency 에 안 들어감
+    tokens.revocations.maybe_sync()
+
+
+@receiver(user_login_failed)
+def count_failed_login(sender, credentials, **kwargs):
+    LogInUsernameThrottle().record_failure(credentials.get("username"))
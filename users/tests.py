@@ -1,3 +1,278 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache as django_cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from common import metrics
+from rest_framework.exceptions import Throttled
+from . import cache, passwords, tokens
+from .models import AuthToken, RevokedToken, User
 
-# Create your tests here.
+
+class TestJWTAuthentication(APITestCase):
+
+    URL = "/api/v1/users/me/"
+
+    def setUp(self):
+        django_cache.clear()
+        cache.users.clear()
+        tokens.revocations.reset()
+        tokens.revocations.sync()
+        self.user = User.objects.create(username="nico", is_host=True)
+        self.user.set_password("123")
+        self.user.save()
+        self.tokens = self.client.post(
+            "/api/v1/users/jwt-login",
+            {"username": "nico", "password": "123"},
+        ).json()
+        self.client.credentials(HTTP_JWT=self.tokens["token"])
+
+    def test_cached_user_skips_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.URL).json()["username"], "nico")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.URL).json()["username"], "nico")
+
+    def test_save_invalidates(self):
+        self.client.get(self.URL)
+        User.objects.get(pk=self.user.pk).save()
+        with self.assertNumQueries(1):
+            self.client.get(self.URL)
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_JWT="nope")
+        self.assertEqual(self.client.get(self.URL).status_code, 403)
+
+    def test_refresh_token_is_not_an_access_token(self):
+        self.client.credentials(HTTP_JWT=self.tokens["refresh"])
+        self.assertEqual(self.client.get(self.URL).status_code, 403)
+
+    @override_settings(JWT_ACCESS_LIFETIME=timedelta(seconds=-1))
+    def test_expired(self):
+        token = tokens.encode(self.user, tokens.ACCESS)
+        self.client.credentials(HTTP_JWT=token)
+        self.assertEqual(self.client.get(self.URL).status_code, 403)
+
+    def test_refresh_rotates(self):
+        refresh = {"refresh": self.tokens["refresh"]}
+        new_tokens = self.client.post("/api/v1/users/jwt-refresh", refresh).json()
+        self.client.credentials(HTTP_JWT=new_tokens["token"])
+        self.assertEqual(self.client.get(self.URL).status_code, 200)
+        # used refresh token is revoked
+        response = self.client.post("/api/v1/users/jwt-refresh", refresh)
+        self.assertEqual(response.status_code, 403)
+
+    def test_refresh_is_not_replayed(self):
+        refresh = {"refresh": self.tokens["refresh"]}
+        # 아직 sync 안 된 다른 worker 라서 메모리 set 에 없는 것처럼
+        with mock.patch.object(tokens.revocations, "is_revoked", return_value=False):
+            first = self.client.post("/api/v1/users/jwt-refresh", refresh)
+            second = self.client.post("/api/v1/users/jwt-refresh", refresh)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 403)
+
+    def test_purge_expired(self):
+        tokens.revoke(tokens.decode(self.tokens["refresh"], tokens.REFRESH))
+        RevokedToken.objects.create(
+            jti="expired",
+            expires_at=datetime.now() - timedelta(days=1),
+        )
+        call_command("purge_revoked_tokens", stdout=StringIO())
+        self.assertEqual(RevokedToken.objects.count(), 1)
+        self.assertFalse(RevokedToken.objects.filter(jti="expired").exists())
+
+    def test_logout_revokes_without_queries(self):
+        self.client.post(
+            "/api/v1/users/jwt-logout", {"refresh": self.tokens["refresh"]}
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.URL).status_code, 403)
+        response = self.client.post("/api/v1/users/jwt-refresh", self.tokens)
+        self.assertEqual(response.status_code, 403)
+
+    def test_revocations_sync_from_db(self):
+        claims = tokens.decode(self.tokens["token"], tokens.ACCESS)
+        RevokedToken.objects.create(
+            jti=claims["jti"],
+            expires_at=datetime.fromtimestamp(claims["exp"]),
+        )
+        self.assertEqual(self.client.get(self.URL).status_code, 200)
+        tokens.revocations.sync()
+        self.assertEqual(self.client.get(self.URL).status_code, 403)
+
+
+class TestHeaderAuthentication(APITestCase):
+
+    URL = "/api/v1/users/me/"
+
+    def setUp(self):
+        django_cache.clear()
+        cache.users.clear()
+        metrics.reset()
+        self.user = User.objects.create(username="nico", is_staff=True)
+        self.user.set_password("123")
+        self.user.save()
+
+    def test_session(self):
+        self.client.post(
+            "/api/v1/users/log-in", {"username": "nico", "password": "123"}
+        )
+        self.assertEqual(self.client.get(self.URL).json()["username"], "nico")
+        self.assertEqual(metrics.snapshot()["counters"]["auth.session"], 1)
+
+    def test_token_skips_session(self):
+        self.client.post(
+            "/api/v1/users/log-in", {"username": "nico", "password": "123"}
+        )
+        token = self.client.post(
+            "/api/v1/users/token-login",
+            {"username": "nico", "password": "123"},
+        ).json()["token"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        metrics.reset()
+        # token + user join only, the session cookie is not read
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.URL).json()["username"], "nico")
+        self.assertNotIn("auth.session", metrics.snapshot()["counters"])
+        with self.assertNumQueries(0):
+            self.client.get(self.URL)
+
+    def test_metrics(self):
+        self.client.credentials(HTTP_TRUST_ME="nico")
+        self.client.get(self.URL)
+        data = self.client.get("/api/v1/metrics").json()
+        self.assertEqual(data["timers"]["auth.trust-me"]["count"], 2)
+        self.client.credentials()
+        self.assertEqual(self.client.get("/api/v1/metrics").status_code, 403)
+
+
+class TestHashedToken(APITestCase):
+
+    URL = "/api/v1/users/me/"
+
+    def setUp(self):
+        django_cache.clear()
+        cache.users.clear()
+        cache.tokens.clear()
+        self.user = User.objects.create(username="nico")
+        self.user.set_password("123")
+        self.user.save()
+        self.token = self.client.post(
+            "/api/v1/users/token-login",
+            {"username": "nico", "password": "123"},
+        ).json()["token"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+
+    def test_key_is_not_stored(self):
+        digest = AuthToken.objects.get().digest
+        self.assertNotEqual(digest, self.token)
+        self.assertEqual(digest, AuthToken.hash_key(self.token))
+
+    def test_revoke(self):
+        self.assertEqual(self.client.get(self.URL).status_code, 200)
+        self.client.post("/api/v1/users/token-logout")
+        self.assertFalse(AuthToken.objects.exists())
+        self.assertEqual(self.client.get(self.URL).status_code, 403)
+
+    def test_revoke_reaches_other_workers(self):
+        self.assertEqual(self.client.get(self.URL).status_code, 200)
+        digest = AuthToken.hash_key(self.token)
+        user_pk = cache.tokens.get(digest)
+        with self.captureOnCommitCallbacks(execute=True):
+            AuthToken.objects.all().delete()
+        # 아직 예전 entry 를 들고 있는 다른 worker
+        cache.tokens.set(digest, user_pk)
+        self.assertEqual(self.client.get(self.URL).status_code, 403)
+        self.assertIsNone(cache.tokens.get(digest))
+
+    def test_cache_stats(self):
+        self.client.get(self.URL)
+        self.client.get(self.URL)
+        stats = metrics.snapshot()["sources"]["token_cache"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+
+class TestLogIn(APITestCase):
+
+    URL = "/api/v1/users/log-in"
+
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create(username="nico")
+        self.user.set_password("123")
+        self.user.save()
+
+    def test_log_in(self):
+        response = self.client.post(self.URL, {"username": "nico", "password": "123"})
+        self.assertEqual(response.json(), {"ok": "Welcome!"})
+        response = self.client.post(self.URL, {"username": "nico", "password": "x"})
+        self.assertEqual(response.json(), {"error": "Wrong password"})
+        response = self.client.post(self.URL, {"username": "nobody", "password": "x"})
+        self.assertEqual(response.json(), {"error": "Wrong password"})
+
+    def test_username_throttle(self):
+        # 성공한 로그인은 세지 않음
+        for attempt in range(12):
+            response = self.client.post(
+                self.URL, {"username": "nico", "password": "123"}
+            )
+            self.assertEqual(response.status_code, 200)
+        for attempt in range(10):
+            self.client.post(self.URL, {"username": "nico", "password": "x"})
+        response = self.client.post(self.URL, {"username": "nico", "password": "123"})
+        self.assertEqual(response.status_code, 429)
+
+    def test_failed_log_in_signal(self):
+        failed = []
+
+        def receiver(sender, credentials, **kwargs):
+            failed.append(credentials)
+
+        user_login_failed.connect(receiver)
+        try:
+            self.client.post(self.URL, {"username": "nico", "password": "x"})
+        finally:
+            user_login_failed.disconnect(receiver)
+        self.assertEqual([credentials["username"] for credentials in failed], ["nico"])
+
+    def test_hash_limit(self):
+        limiter = passwords.PasswordHashLimiter(workers=1, queue=1)
+        started = threading.Event()
+        finish = threading.Event()
+        ran = []
+
+        def busy():
+            started.set()
+            finish.wait(5)
+
+        running = threading.Thread(target=limiter.run, args=(busy,))
+        running.start()
+        started.wait(5)
+        # 1 개는 기다리고, 자리가 없는 그 다음은 바로 429
+        waiting = threading.Thread(target=limiter.run, args=(ran.append, "waited"))
+        waiting.start()
+        while metrics.snapshot()["gauges"]["password_hash.queue_depth"] < 1:
+            time.sleep(0.01)
+        self.assertEqual(ran, [])
+        with self.assertRaises(Throttled):
+            limiter.run(len, "password")
+        finish.set()
+        running.join(5)
+        waiting.join(5)
+        self.assertEqual(ran, ["waited"])
+        self.assertEqual(limiter.run(len, "password"), 8)
+
+    def test_change_password(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.put(
+            "/api/v1/users/change-password",
+            {"old_password": "123", "new_password": "456"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("456"))
@@ -0,0 +1,50 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LogInIPThrottle(SimpleRateThrottle):
+
+    """log in / password change attempts per client IP"""
+
+    scope = "login_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class LogInUsernameThrottle(SimpleRateThrottle):
+
+    """
+    failed attempts per username, so one account can't be brute forced from many IPs.
+    성공한 로그인까지 세면 username 만 알면 남의 계정을 잠글 수 있어서
+    실패만 셈 (users/signals.py 의 user_login_failed 에서 record_failure)
+    """
+
+    scope = "login_username"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            username = request.user.username
+        else:
+            username = request.data.get("username")
+        return self.key_for(username)
+
+    def key_for(self, username):
+        if not username:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": username}
+
+    def throttle_success(self):
+        # 확인만 하고 기록은 안 함
+        return True
+
+    def record_failure(self, username):
+        key = self.key_for(username)
+        if key is None:
+            return
+        now = self.timer()
+        history = [at for at in self.cache.get(key, []) if at > now - self.duration]
+        history.insert(0, now)
+        self.cache.set(key, history, self.duration)
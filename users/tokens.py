@@ -0,0 +1,131 @@
+"""
+JWT access / refresh tokens and the in-memory revocation list.
+
+access token 은 JWT_ACCESS_LIFETIME 동안만 쓰고, refresh token 으로 새로 받음.
+로그아웃한 token 의 jti 는 RevokedToken 에 저장되고, 각 worker 는 그 jti 들을
+메모리 set 으로 들고 있어서 인증할 때 DB 를 읽지 않음.
+set 은 response 를 보낸 뒤 (request_finished) 에 JWT_REVOCATION_SYNC_SECONDS 마다
+새로 추가된 row 만 (pk > 마지막 pk) 읽어서 갱신하고, 만료된 jti 는 버림
+(만료된 token 은 어차피 exp 로 거절되니까 set 은 "revoke 됐지만 아직 안 만료된" 것만 가짐)
+만료된 row 는 `python manage.py purge_revoked_tokens` 로 지움 (cron)
+"""
+import threading
+import time
+import uuid
+from datetime import datetime
+import jwt
+from django.conf import settings
+from .models import RevokedToken
+
+ALGORITHM = "HS256"
+
+# request.auth is the decoded claims, permission checks can read them without loading anything
+USER_CLAIMS = ("pk", "username", "is_host", "is_staff")
+
+ACCESS = "access"
+
+REFRESH = "refresh"
+
+
+def encode(user, token_type):
+    now = int(time.time())
+    lifetime = {
+        ACCESS: settings.JWT_ACCESS_LIFETIME,
+        REFRESH: settings.JWT_REFRESH_LIFETIME,
+    }[token_type]
+    claims = {claim: getattr(user, claim) for claim in USER_CLAIMS}
+    claims.update(
+        type=token_type,
+        jti=uuid.uuid4().hex,
+        iat=now,
+        exp=now + int(lifetime.total_seconds()),
+    )
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+
+def issue_pair(user):
+    return {"token": encode(user, ACCESS), "refresh": encode(user, REFRESH)}
+
+
+def decode(token, token_type):
+    """raises jwt.InvalidTokenError (expired, wrong type, revoked, ...)"""
+    claims = jwt.decode(
+        token,
+        settings.SECRET_KEY,
+        algorithms=[ALGORITHM],
+        options={"require": ["exp", "jti", "pk", "type"]},
+    )
+    if claims["type"] != token_type:
+        raise jwt.InvalidTokenError("Wrong token type")
+    if revocations.is_revoked(claims["jti"]):
+        raise jwt.InvalidTokenError("Revoked token")
+    return claims
+
+
+def revoke(claims):
+    """False if the token was already revoked (maybe by another worker)"""
+    expires_at = datetime.fromtimestamp(claims["exp"])
+    # jti 가 unique 라서 동시에 두 번 revoke 해도 하나만 created
+    _, created = RevokedToken.objects.get_or_create(
+        jti=claims["jti"],
+        defaults={"expires_at": expires_at},
+    )
+    revocations.add(claims["jti"], claims["exp"])
+    return created
+
+
+def purge_expired():
+    """deletes revoked rows that expired anyway, returns how many"""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lt=datetime.now()).delete()
+    return deleted
+
+
+class RevocationList:
+    def __init__(self):
+        self._revoked = {}  # jti > exp (unix time)
+        self._last_pk = 0
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    def add(self, jti, exp):
+        with self._lock:
+            self._revoked[jti] = exp
+
+    def is_revoked(self, jti):
+        if self._synced_at is None:
+            self.sync()  # worker 가 뜬 뒤 첫 인증에서 한번만
+        return jti in self._revoked
+
+    def sync(self):
+        now = datetime.now()
+        rows = RevokedToken.objects.filter(pk__gt=self._last_pk)
+        if self._synced_at is None:
+            rows = rows.filter(expires_at__gt=now)
+        rows = list(rows.values_list("pk", "jti", "expires_at"))
+        with self._lock:
+            for pk, jti, expires_at in rows:
+                self._revoked[jti] = expires_at.timestamp()
+                self._last_pk = max(self._last_pk, pk)
+            unix_now = time.time()
+            for jti in [jti for jti, exp in self._revoked.items() if exp <= unix_now]:
+                del self._revoked[jti]
+            self._synced_at = time.monotonic()
+
+    def maybe_sync(self):
+        interval = getattr(settings, "JWT_REVOCATION_SYNC_SECONDS", 30)
+        if self._synced_at is not None and (
+            time.monotonic() - self._synced_at >= interval
+        ):
+            self.sync()
+
+    def reset(self):
+        with self._lock:
+            self._revoked.clear()
+            self._last_pk = 0
+            self._synced_at = None
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+revocations = RevocationList()
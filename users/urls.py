@@ -1,5 +1,4 @@
 from django.urls import path
-from rest_framework.authtoken.views import obtain_auth_token
 from . import views
 
 urlpatterns = [
@@ -8,7 +7,10 @@ urlpatterns = [
     path("change-password", views.ChangePassword.as_view()),
     path("log-in", views.LogIn.as_view()),  # cookie login
     path("log-out", views.LogOut.as_view()),
-    path("token-login", obtain_auth_token),  # token login
+    path("token-login", views.TokenLogIn.as_view()),  # token login
+    path("token-logout", views.TokenLogOut.as_view()),
     path("jwt-login", views.JWTLogIn.as_view()),  # jwt login
+    path("jwt-refresh", views.JWTRefresh.as_view()),
+    path("jwt-logout", views.JWTLogOut.as_view()),
     path("@<str:username>", views.PublicUser.as_view()),  # what @?
 ]
@@ -1,13 +1,14 @@
 import jwt
-from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
-from rest_framework.exceptions import ParseError, NotFound
+from rest_framework.exceptions import AuthenticationFailed, ParseError, NotFound
 from rest_framework.permissions import IsAuthenticated
 from . import serializers
-from users.models import User
+from users.models import AuthToken, User
+from . import passwords, tokens
+from .throttles import LogInIPThrottle, LogInUsernameThrottle
 
 
 class Me(APIView):
@@ -65,6 +66,7 @@ class PublicUser(APIView):
 class ChangePassword(APIView):
 
     permission_classes = [IsAuthenticated]
+    throttle_classes = [LogInIPThrottle, LogInUsernameThrottle]
 
     def put(self, request):
         user = request.user
@@ -72,8 +74,9 @@ class ChangePassword(APIView):
         new_password = request.data.get("new_password")
         if not old_password or not new_password:
             raise ParseError
-        if user.check_password(old_password):
-            user.set_password(new_password)
+        # authenticate() 를 거쳐야 실패가 user_login_failed 로 throttle 에 잡힘
+        if authenticate(request, username=user.username, password=old_password):
+            passwords.set_password(user, new_password)
             user.save()
             return Response(status=status.HTTP_200_OK)
         else:
@@ -81,6 +84,9 @@ class ChangePassword(APIView):
 
 
 class LogIn(APIView):
+
+    throttle_classes = [LogInIPThrottle, LogInUsernameThrottle]
+
     def post(self, request):
 
         username = request.data.get("username")
@@ -108,6 +114,9 @@ class LogOut(APIView):
 
 
 class JWTLogIn(APIView):
+
+    throttle_classes = [LogInIPThrottle, LogInUsernameThrottle]
+
     def post(self, request):
         username = request.data.get("username")
         password = request.data.get("password")
@@ -115,11 +124,68 @@ class JWTLogIn(APIView):
             raise ParseError
         user = authenticate(request, username=username, password=password)
         if user:
-            token = jwt.encode(
-                {"pk": user.pk},
-                settings.SECRET_KEY,
-                algorithm="HS256",
-            )  # secret key in setting.py is never used source code. later, change new secret key
-            return Response({"token": token})
+            # secret key in setting.py is never used source code. later, change new secret key
+            return Response(tokens.issue_pair(user))
         else:
             return Response({"Error": "Wrong password"})
+
+
+class JWTRefresh(APIView):
+    def post(self, request):
+        refresh = request.data.get("refresh")
+        if not refresh:
+            raise ParseError
+        try:
+            claims = tokens.decode(refresh, tokens.REFRESH)
+            user = User.objects.get(pk=claims["pk"], is_active=True)
+        except (jwt.InvalidTokenError, User.DoesNotExist):
+            raise AuthenticationFailed("Invaild Token")
+        # refresh token 은 한번만 쓸 수 있음 (rotation)
+        # 메모리 set 은 늦게 sync 될 수 있어서 DB 에 처음 revoke 한 request 만 새로 받음
+        if not tokens.revoke(claims):
+            raise AuthenticationFailed("Invaild Token")
+        return Response(tokens.issue_pair(user))
+
+
+class JWTLogOut(APIView):
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not isinstance(request.auth, dict):
+            raise ParseError("Log in with a jwt first")
+        tokens.revoke(request.auth)
+        refresh = request.data.get("refresh")
+        if refresh:
+            try:
+                tokens.revoke(tokens.decode(refresh, tokens.REFRESH))
+            except jwt.InvalidTokenError:
+                pass
+        return Response({"ok": "bye!"})
+
+
+class TokenLogIn(APIView):
+
+    throttle_classes = [LogInIPThrottle, LogInUsernameThrottle]
+
+    def post(self, request):
+        username = request.data.get("username")
+        password = request.data.get("password")
+        if not username or not password:
+            raise ParseError
+        user = authenticate(request, username=username, password=password)
+        if user:
+            return Response({"token": AuthToken.objects.issue(user)})
+        else:
+            return Response({"error": "Wrong password"})
+
+
+class TokenLogOut(APIView):
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not isinstance(request.auth, str):
+            raise ParseError("Log in with a token first")
+        AuthToken.objects.filter(digest=AuthToken.hash_key(request.auth)).delete()
+        return Response({"ok": "bye!"})
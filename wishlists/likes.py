@@ -0,0 +1,27 @@
+"""
+room pks in the current user's wishlists, looked up once per request
+
+serializer 마다 (room 마다) exists() 를 하면 N+1 이라서, 처음 물어볼 때 한번만
+through table 에서 읽고 request 에 붙여둠. 같은 request 의 다른 serializer 도 재사용함.
+"""
+from .models import Wishlist
+
+
+def liked_room_pks(request):
+    if request is None or not request.user.is_authenticated:
+        return frozenset()
+    liked = getattr(request, "_liked_room_pks", None)
+    if liked is None:
+        liked = frozenset(
+            Wishlist.rooms.through.objects.filter(
+                wishlist__user_id=request.user.pk,
+            ).values_list("room_id", flat=True)
+        )
+        request._liked_room_pks = liked
+    return liked
+
+
+def forget(request):
+    """after the user's wishlists changed in this request"""
+    if request is not None and hasattr(request, "_liked_room_pks"):
+        del request._liked_room_pks
@@ -0,0 +1,99 @@
+"""
+set based add / remove of rooms and experiences in a wishlist
+
+room 하나씩 get > exists > add/remove 하면 id 마다 query 가 3~4번이라,
+relation 마다 (있는 id 확인, 이미 들어있는 id 확인, insert 한번, delete 한번) 만 씀.
+"""
+from django.db import transaction
+from experiences.models import Experience
+from rooms import popularity
+from rooms.models import Room
+from .models import Wishlist
+
+ADDED = "added"
+ALREADY_ADDED = "already_added"
+REMOVED = "removed"
+NOT_IN_WISHLIST = "not_in_wishlist"
+NOT_FOUND = "not_found"
+
+# field name of the M2M on Wishlist > target model
+RELATIONS = {
+    "rooms": Room,
+    "experiences": Experience,
+}
+
+
+def apply_relation(wishlist, field, add, remove):
+    """{pk: result} for every pk in add and remove"""
+    through = getattr(Wishlist, field).through
+    target = getattr(Wishlist, field).field.m2m_reverse_name()  # room_id
+    pks = set(add) | set(remove)
+    if not pks:
+        return {}
+    existing = set(
+        RELATIONS[field].objects.filter(pk__in=pks).values_list("pk", flat=True)
+    )
+    members = set(
+        through.objects.filter(
+            wishlist_id=wishlist.pk,
+            **{f"{target}__in": existing},
+        ).values_list(target, flat=True)
+    )
+    results = {pk: NOT_FOUND for pk in pks - existing}
+    to_add = sorted(set(add) & existing - members)
+    to_remove = sorted(set(remove) & members)
+    if to_add:
+        through.objects.bulk_create(
+            [through(wishlist_id=wishlist.pk, **{target: pk}) for pk in to_add],
+            ignore_conflicts=True,
+        )
+    if to_remove:
+        through.objects.filter(
+            wishlist_id=wishlist.pk,
+            **{f"{target}__in": to_remove},
+        ).delete()
+    if field == "rooms":
+        for pk in to_add:
+            popularity.saved(pk)
+        for pk in to_remove:
+            popularity.saved(pk, -1)
+    for pk in set(add) & existing:
+        results[pk] = ADDED if pk in to_add else ALREADY_ADDED
+    for pk in set(remove) & existing:
+        results[pk] = REMOVED if pk in to_remove else NOT_IN_WISHLIST
+    return results
+
+
+def apply(wishlist, changes):
+    """
+    changes: {"rooms": {"add": [pk], "remove": [pk]}, "experiences": {...}}
+    returns the same shape with {pk: result} per relation
+    """
+    with transaction.atomic():
+        return {
+            field: apply_relation(
+                wishlist,
+                field,
+                change.get("add", []),
+                change.get("remove", []),
+            )
+            for field, change in changes.items()
+        }
+
+
+def toggle_room(wishlist, room_pk):
+    """removes the room if it is in the wishlist, otherwise adds it. None if no room"""
+    through = Wishlist.rooms.through
+    with transaction.atomic():
+        deleted, _ = through.objects.filter(
+            wishlist_id=wishlist.pk,
+            room_id=room_pk,
+        ).delete()
+        if deleted:
+            popularity.saved(room_pk, -1)
+            return REMOVED
+        if not Room.objects.filter(pk=room_pk).exists():
+            return None
+        through.objects.create(wishlist_id=wishlist.pk, room_id=room_pk)
+        popularity.saved(room_pk)
+        return ADDED
@@ -0,0 +1,67 @@
+"""
+first few rooms + room count of each wishlist, for GET api/v1/wishlists/
+
+wishlist 마다 rooms 를 prefetch 하면 전체 room 을 다 가져오게 되고 (Django 4.1 은
+prefetch 를 slice 할 수 없음), wishlist 마다 query 하면 N+1 이라서
+room 수는 through table 의 GROUP BY 로 세고, 미리보기는 ROW_NUMBER() 로
+wishlist 안에서 순위를 매겨 limit 안쪽 (wishlist_id, room_id) 만 돌려받아서 room 은 한번만 가져옴.
+through row 는 한번만 훑고 (correlated subquery 처럼 row 마다 정렬하지 않음),
+wishlist 가 몇 개든 query 수는 같음 (counts, pairs, rooms, photos).
+Django 4.1 은 window 결과로 filter 할 수 없어서 바깥 WHERE 만 SQL 로 감쌈.
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from rooms.models import Room
+from .models import Wishlist
+
+
+def attach(wishlists, limit=None):
+    """
+    sets .preview_rooms and .rooms_count on each wishlist, previews are in the
+    order of api/v1/wishlists/<pk>/rooms (newest room first)
+    """
+    if limit is None:
+        limit = settings.WISHLIST_PREVIEW_ROOMS
+    wishlists = list(wishlists)
+    by_pk = {wishlist.pk: wishlist for wishlist in wishlists}
+    if not by_pk:
+        return wishlists
+    through = Wishlist.rooms.through.objects
+    counts = dict(
+        through.filter(wishlist_id__in=by_pk)
+        .values("wishlist_id")
+        .annotate(count=Count("pk"))
+        .values_list("wishlist_id", "count")
+    )
+    previews = {pk: [] for pk in by_pk}
+    if limit:
+        ranked = (
+            through.filter(wishlist_id__in=by_pk)
+            .annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=F("wishlist_id"),
+                    order_by=(F("room__created_at").desc(), F("room_id").desc()),
+                )
+            )
+            .order_by()
+            .values_list("wishlist_id", "room_id", "rank")
+        )
+        sql, params = ranked.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT * FROM ({sql}) ranked WHERE "rank" <= %s ORDER BY "rank"',
+                [*params, limit],
+            )
+            for wishlist_pk, room_pk, _ in cursor.fetchall():
+                previews[wishlist_pk].append(room_pk)
+    room_pks = {room_pk for room_pks in previews.values() for room_pk in room_pks}
+    rooms = Room.objects.for_list().in_bulk(room_pks) if room_pks else {}
+    for pk, wishlist in by_pk.items():
+        wishlist.preview_rooms = [
+            rooms[room_pk] for room_pk in previews[pk] if room_pk in rooms
+        ]
+        wishlist.rooms_count = counts.get(pk, 0)
+    return wishlists
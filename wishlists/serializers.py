@@ -6,7 +6,13 @@ from rooms.serializers import RoomListSerializer
 
 class WishlistSerializer(serializers.ModelSerializer):
 
-    rooms = RoomListSerializer(many=True, read_only=True)
+    # wishlists.previews.attach 가 채워줌, 나머지는 api/v1/wishlists/<pk>/rooms
+    rooms = RoomListSerializer(
+        source="preview_rooms",
+        many=True,
+        read_only=True,
+    )
+    rooms_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Wishlist
@@ -14,4 +20,37 @@ class WishlistSerializer(serializers.ModelSerializer):
             "pk",
             "name",
             "rooms",
+            "rooms_count",
         )
+
+
+class MembershipChangeSerializer(serializers.Serializer):
+
+    add = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=500,
+    )
+    remove = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=500,
+    )
+
+    def validate(self, data):
+        if set(data.get("add", [])) & set(data.get("remove", [])):
+            raise serializers.ValidationError("Same id can't be added and removed")
+        return data
+
+
+class WishlistItemsSerializer(serializers.Serializer):
+
+    """body of PUT api/v1/wishlists/<pk>/items"""
+
+    rooms = MembershipChangeSerializer(required=False)
+    experiences = MembershipChangeSerializer(required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError("rooms or experiences is required")
+        return data
@@ -1,3 +1,171 @@
-from django.test import TestCase
+from rest_framework.test import APITestCase
+from medias.models import Photo
+from rooms import popularity
+from rooms.models import Room
+from users.models import User
+from .models import Wishlist
 
-# Create your tests here.
+
+class TestWishlists(APITestCase):
+
+    URL = "/api/v1/wishlists/"
+
+    # wishlists + room counts + preview pairs + rooms + photos + liked room pks
+    LIST_QUERIES = 6
+
+    def setUp(self):
+        self.user = User.objects.create(username="nico")
+        self.client.force_authenticate(self.user)
+
+    def create_wishlist(self, room_count):
+        wishlist = Wishlist.objects.create(name="trip", user=self.user)
+        for i in range(room_count):
+            room = Room.objects.create(
+                name=f"Room {i}",
+                price=100,
+                rooms=1,
+                toilets=1,
+                description="desc",
+                address="address",
+                kind=Room.RoomKindChoices.ENTIRE_PLACE,
+                owner=self.user,
+            )
+            Photo.objects.create(
+                file="https://example.com/photo.jpg",
+                description="photo",
+                room=room,
+            )
+            wishlist.rooms.add(room)
+        return wishlist
+
+    def test_query_count_is_constant(self):
+        self.create_wishlist(2)
+        with self.assertNumQueries(self.LIST_QUERIES):
+            self.client.get(self.URL)
+
+        self.create_wishlist(5)
+        self.create_wishlist(0)
+        with self.assertNumQueries(self.LIST_QUERIES):
+            data = self.client.get(self.URL).json()
+        self.assertEqual(
+            [(len(wishlist["rooms"]), wishlist["rooms_count"]) for wishlist in data],
+            [(2, 2), (3, 5), (0, 0)],
+        )
+        self.assertEqual(len(data[1]["rooms"][0]["photos"]), 1)
+
+    def test_preview_matches_rooms_order(self):
+        wishlist = self.create_wishlist(4)
+        # 추가한 순서가 아니라 /rooms 와 같은 순서 (새 room 먼저)
+        first = wishlist.rooms.order_by("pk").first()
+        wishlist.rooms.remove(first)
+        wishlist.rooms.add(first)
+        data = self.client.get(f"{self.URL}{wishlist.pk}").json()
+        self.assertEqual(
+            [room["name"] for room in data["rooms"]],
+            ["Room 3", "Room 2", "Room 1"],
+        )
+        rooms = self.client.get(f"{self.URL}{wishlist.pk}/rooms").json()["results"]
+        self.assertEqual(
+            [room["name"] for room in rooms[:3]],
+            [room["name"] for room in data["rooms"]],
+        )
+
+    def test_wishlist_rooms_pagination(self):
+        wishlist = self.create_wishlist(5)
+        self.create_wishlist(2)
+        url = f"{self.URL}{wishlist.pk}/rooms"
+
+        seen = []
+        params = {"page_size": 2}
+        while True:
+            data = self.client.get(url, params).json()
+            seen += [room["name"] for room in data["results"]]
+            if not data["next"]:
+                break
+            params["cursor"] = data["next"]
+        self.assertEqual(sorted(seen), [f"Room {i}" for i in range(5)])
+
+        other = User.objects.create(username="other")
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class TestWishlistItems(APITestCase):
+    def setUp(self):
+        popularity.counter.clear()
+        self.user = User.objects.create(username="nico")
+        self.client.force_authenticate(self.user)
+        self.wishlist = Wishlist.objects.create(name="trip", user=self.user)
+        self.rooms = [
+            Room.objects.create(
+                name=f"Room {i}",
+                price=100,
+                rooms=1,
+                toilets=1,
+                description="desc",
+                address="address",
+                kind=Room.RoomKindChoices.ENTIRE_PLACE,
+                owner=self.user,
+            )
+            for i in range(3)
+        ]
+        self.url = f"/api/v1/wishlists/{self.wishlist.pk}/items"
+
+    def test_bulk_add_and_remove(self):
+        first, second, third = [room.pk for room in self.rooms]
+        self.wishlist.rooms.add(first)
+        # wishlist + (existing, members, insert, delete) + transaction savepoint
+        with self.assertNumQueries(7), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                self.url,
+                {"rooms": {"add": [second, third, 999], "remove": [first]}},
+                format="json",
+            )
+        self.assertEqual(
+            response.json(),
+            {
+                "rooms": {
+                    str(second): "added",
+                    str(third): "added",
+                    "999": "not_found",
+                    str(first): "removed",
+                }
+            },
+        )
+        self.assertEqual(
+            set(self.wishlist.rooms.values_list("pk", flat=True)),
+            {second, third},
+        )
+        popularity.counter.flush()
+        self.assertEqual(
+            dict(Room.objects.values_list("pk", "save_count")),
+            {first: 0, second: 1, third: 1},
+        )
+
+        response = self.client.put(
+            self.url,
+            {"rooms": {"add": [second], "remove": [first]}},
+            format="json",
+        )
+        self.assertEqual(
+            response.json()["rooms"],
+            {str(second): "already_added", str(first): "not_in_wishlist"},
+        )
+
+    def test_same_id_in_add_and_remove(self):
+        pk = self.rooms[0].pk
+        response = self.client.put(
+            self.url,
+            {"rooms": {"add": [pk], "remove": [pk]}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_toggle(self):
+        url = f"/api/v1/wishlists/{self.wishlist.pk}/rooms/{self.rooms[0].pk}"
+        self.client.put(url)
+        self.assertTrue(self.wishlist.rooms.filter(pk=self.rooms[0].pk).exists())
+        self.client.put(url)
+        self.assertFalse(self.wishlist.rooms.exists())
+        response = self.client.put(f"/api/v1/wishlists/{self.wishlist.pk}/rooms/999")
+        self.assertEqual(response.status_code, 404)
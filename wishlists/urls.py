@@ -4,5 +4,7 @@ from . import views
 urlpatterns = [
     path("", views.Wishlists.as_view()),
     path("<int:pk>", views.WishlistsDetail.as_view()),
+    path("<int:pk>/rooms", views.WishlistRooms.as_view()),
+    path("<int:pk>/items", views.WishlistItems.as_view()),
     path("<int:pk>/rooms/<int:room_pk>", views.WishlistToggle.as_view()),
 ]
@@ -3,9 +3,11 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import NotFound
 from rest_framework.status import HTTP_200_OK
-from rooms.models import Room
+from common.pagination import KeysetPagination
+from rooms.serializers import RoomListSerializer
 from .models import Wishlist
-from .serializers import WishlistSerializer
+from .serializers import WishlistSerializer, WishlistItemsSerializer
+from . import likes, membership, previews
 
 
 class Wishlists(APIView):
@@ -13,7 +15,7 @@ class Wishlists(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        all_wishlists = Wishlist.objects.filter(user=request.user)
+        all_wishlists = previews.attach(Wishlist.objects.filter(user=request.user))
         serializer = WishlistSerializer(
             all_wishlists,
             many=True,
@@ -27,7 +29,8 @@ class Wishlists(APIView):
             wishlist = serializer.save(
                 user=request.user,
             )
-            serializer = WishlistSerializer(wishlist)
+            previews.attach([wishlist])
+            serializer = WishlistSerializer(wishlist, context={"request": request})
             return Response(serializer.data)
         else:
             return Response(serializer.errors)
@@ -45,6 +48,7 @@ class WishlistsDetail(APIView):
 
     def get(self, request, pk):
         wishlist = self.get_object(pk, request.user)
+        previews.attach([wishlist])
         serializer = WishlistSerializer(
             wishlist,
             context={"request": request},
@@ -65,30 +69,75 @@ class WishlistsDetail(APIView):
         )
         if serializer.is_valid():
             wishlist = serializer.save()
-            serializer = WishlistSerializer(wishlist)
+            previews.attach([wishlist])
+            serializer = WishlistSerializer(wishlist, context={"request": request})
             return Response(serializer.data)
         else:
             return Response(serializer.errors)
 
 
-class WishlistToggle(APIView):
-    def get_list(self, pk, user):
+class WishlistRooms(APIView):
+
+    """GET api/v1/wishlists/<pk>/rooms?cursor=&page_size=, every room of the wishlist"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self, pk, user):
         try:
             return Wishlist.objects.get(pk=pk, user=user)
         except Wishlist.DoesNotExist:
             raise NotFound
 
-    def get_room(self, room_pk):
+    def get(self, request, pk):
+        wishlist = self.get_object(pk, request.user)
+        paginator = KeysetPagination()
+        rooms = paginator.paginate_queryset(wishlist.rooms.for_list(), request)
+        serializer = RoomListSerializer(
+            rooms,
+            many=True,
+            context={"request": request},
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+
+class WishlistItems(APIView):
+
+    """
+    PUT api/v1/wishlists/<pk>/items
+    {"rooms": {"add": [1, 2], "remove": [3]}, "experiences": {"add": [4]}}
+    > {"rooms": {"1": "added", "2": "already_added", "3": "removed"}, ...}
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self, pk, user):
         try:
-            return Room.objects.get(pk=room_pk)
-        except Room.DoesNotExist:
+            return Wishlist.objects.get(pk=pk, user=user)
+        except Wishlist.DoesNotExist:
+            raise NotFound
+
+    def put(self, request, pk):
+        wishlist = self.get_object(pk, request.user)
+        serializer = WishlistItemsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = membership.apply(wishlist, serializer.validated_data)
+        likes.forget(request)
+        return Response(results)
+
+
+class WishlistToggle(APIView):
+
+    permission_classes = [IsAuthenticated]
+
+    def get_list(self, pk, user):
+        try:
+            return Wishlist.objects.get(pk=pk, user=user)
+        except Wishlist.DoesNotExist:
             raise NotFound
 
     def put(self, request, pk, room_pk):
         wishlist = self.get_list(pk, request.user)
-        room = self.get_room(room_pk)
-        if wishlist.rooms.filter(pk=room_pk).exists():
-            wishlist.rooms.remove(room)
-        else:
-            wishlist.rooms.add(room)
+        if not membership.toggle_room(wishlist, room_pk):
+            raise NotFound
+        likes.forget(request)
         return Response(status=HTTP_200_OK)